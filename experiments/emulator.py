@@ -0,0 +1,613 @@
+#!/usr/bin/python3
+"""
+Local stand-in for the UE, adb and iperf3, to run and load-test the collectors without hardware.
+
+`python3 emulator.py install BIN_DIR` writes adb, ping, iperf3 and ssh shims and the emulator
+configuration into BIN_DIR. With BIN_DIR first in PATH, the collectors (logger.py,
+ping_script.py, iperf3_client.py) run against the emulator:
+
+- adb [-H host] [-s serial] shell dumpsys telephony.registry: cell signal sample, replayed
+  from a campaign (--trace logs_DD_MM) or generated, with one trace cursor per device.
+- adb shell ping / ping: ping -D -O output, with RTTs from the campaign, packet loss and
+  unreachable destinations.
+- adb shell .../iperf3.9 -J / iperf3 -J: iperf3 JSON report (TCP/UDP, reverse and bidir),
+  with the interval throughput from the campaign.
+- adb shell cat /proc/net/dev: interface byte counters, advanced at the campaign TCP
+  throughput (one sample per emulated second).
+- ssh [options] host command: loopback stand-in for the log server, the command runs
+  locally; a failure cuts the connection after a random part of the standard input
+  (to test the resume of interrupted transfers).
+
+Every command can be delayed (--latency-ms, --jitter-ms) or fail (--failure-rate), and
+--time-scale sets how fast the emulated time runs (0 answers immediately, to stress the
+collectors at the maximum sample rate).
+"""
+
+# Every shim invocation starts a new interpreter, so only the modules needed to answer the
+# commands are imported here; argparse, array, glob, json and subprocess are imported where used
+import fcntl
+import marshal
+import math
+import os
+import random
+import sys
+import time
+import zlib
+
+# Configuration of the shims (marshal, which is built into the interpreter, loads it faster than json)
+CONFIG_FILE = "emulator-config.bin"
+
+# Binary trace files (array typecode and values per sample), read by offset at each command
+TRACE_FORMATS = {
+    "cell_info": ("h", 5),
+    "rtt_ms": ("f", 1),
+    "throughput_bps": ("d", 1),
+}
+
+SHIMS = ["adb", "ping", "iperf3", "ssh"]
+
+# ssh options followed by a value
+SSH_VALUE_OPTIONS = set("BbcDEeFIiJLlmOopQRSWw")
+
+# Define mapping of file patterns to scenarios (as in logs/get_data.py)
+SCENARIO_MAP = {
+    r"-udp-bidir-": "udp-bidir",
+    r"-bidir-": "tcp-bidir",
+    r"-udp-reverse-": "udp-downlink",
+    r"-reverse-": "tcp-downlink",
+    r"-udp-": "udp-uplink",
+}
+
+# Mean throughput (bps) when no trace is replayed, in the order (uplink, downlink)
+MEAN_THROUGHPUT_BPS = {"tcp": (110e6, 300e6), "udp": (110e6, 400e6)}
+
+UE_IP = "10.48.0.57"
+GATEWAY_IP = "10.48.0.1"
+
+DUMPSYS_TEMPLATE = """last known state:
+  Phone Id=0
+  mCallState=0
+  mServiceState={{mVoiceRegState=0(IN_SERVICE), mDataRegState=0(IN_SERVICE), mChannelNumber=643334, mNrFrequencyRange=3}}
+  mSignalStrength=SignalStrength:{{mCdma=Invalid mGsm=Invalid mWcdma=Invalid mTdscdma=Invalid mLte=Invalid mNr=CellSignalStrengthNr:{{ csiRsrp = 2147483647 csiRsrq = 2147483647 csiCqiTableIndex = 2147483647 csiCqiReport = [] ssRsrp = {ssRsrp} ssRsrq = {ssRsrq} ssSinr = {ssSinr} level = {level} parametersUseForLevel = 0 }},primary=CellSignalStrengthNr}}
+  mDataConnectionState=2
+  mPhysicalChannelConfigs=[{{mConnectionStatus=PrimaryServing,mCellConnectionStatus=1,mCellBandwidthDownlinkKhz=100000,mCellBandwidthUplinkKhz=100000,mNetworkType=NR,mFrequencyRange=HIGH,mDownlinkChannelNumber=643334,mUplinkChannelNumber=643334,mContextIds=[1],mPhysicalCellId=1,mBands = [{mBands}]}}]
+"""
+
+NET_DEV_HEADER = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+"""
+
+def load_trace(logs_dir):
+    """
+    Compiles a measurement campaign into the compact trace replayed by the emulator.
+
+    Parameters:
+        logs_dir (str): Campaign directory with cell_info, iperf3 and ping JSON files (e.g., logs/logs_22_02).
+
+    Returns:
+        dict: Arrays with the cell samples (mBands, ssRsrp, ssRsrq, ssSinr and level of each sample),
+              the ping RTTs (ms) and the interval throughput (bps) of each protocol and direction
+              (e.g., throughput_bps-tcp-uplink).
+    """
+
+    import array
+    import glob
+    import json
+
+    trace = {"cell_info": array.array("h"), "rtt_ms": array.array("f")}
+
+    for file_path in sorted(glob.glob(os.path.join(logs_dir, "*.json"))):
+        file_name = os.path.basename(file_path)
+        with open(file_path, "r") as file:
+            data = json.load(file)
+        if not data:
+            continue
+
+        if file_name.startswith("cell_info"):
+            for sample in data.get("samples", []):
+                values = [sample["mBands"], sample["ssRsrp"], sample["ssRsrq"], sample["ssSinr"], sample["level"]]
+                trace["cell_info"].extend(values * sample.get("count", 1))
+
+        elif file_name.startswith("ping"):
+            trace["rtt_ms"].extend(
+                response["time_ms"] for response in data.get("responses", []) if "time_ms" in response
+            )
+
+        elif file_name.startswith("iperf3"):
+            scenario = next((s for pattern, s in SCENARIO_MAP.items() if pattern in file_name), "tcp-uplink")
+            protocol = scenario.split("-")[0]
+            for interval in data.get("intervals", []):
+                for stream in interval.get("streams", []):
+                    direction = "uplink" if stream.get("sender") else "downlink"
+                    key = f"throughput_bps-{protocol}-{direction}"
+                    trace.setdefault(key, array.array("d")).append(stream["bits_per_second"])
+
+    return trace
+
+def install(bin_dir, config, trace):
+    """
+    Writes the emulator configuration, the trace files and the adb, ping, iperf3 and ssh shims.
+
+    Parameters:
+        bin_dir (str): Directory of the shims (to be prepended to PATH).
+        config (dict): Emulator configuration.
+        trace (dict): Trace arrays (see load_trace), possibly empty.
+    """
+
+    os.makedirs(os.path.join(bin_dir, "state"), exist_ok=True)
+    os.makedirs(os.path.join(bin_dir, "trace"), exist_ok=True)
+
+    with open(os.path.join(bin_dir, CONFIG_FILE), "wb") as outfile:
+        marshal.dump(config, outfile)
+
+    for name in os.listdir(os.path.join(bin_dir, "trace")):
+        os.remove(os.path.join(bin_dir, "trace", name))
+    for name, values in trace.items():
+        if values:
+            with open(os.path.join(bin_dir, "trace", f"{name}.bin"), "wb") as outfile:
+                values.tofile(outfile)
+
+    # -S skips the site initialization, and importing the emulator (instead of running it as a
+    # script) reuses its compiled bytecode, which dominate the start-up time of the shims. The
+    # bytecode is written here, as imports do not write it with PYTHONDONTWRITEBYTECODE.
+    import py_compile
+
+    py_compile.compile(os.path.abspath(__file__))
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shim_code = f"import sys; sys.path.insert(0, {script_dir!r}); from emulator import main; main()"
+
+    for shim in SHIMS:
+        shim_path = os.path.join(bin_dir, shim)
+        with open(shim_path, "w") as outfile:
+            outfile.write(
+                f'#!/bin/sh\nREPLICA_EMULATOR_DIR="{os.path.abspath(bin_dir)}" '
+                f'exec "{sys.executable}" -S -c "{shim_code}" {shim} "$@"\n'
+            )
+        os.chmod(shim_path, 0o755)
+
+def next_cursor(state_dir, key, step=1):
+    """
+    Returns the trace position of a device and advances it (shared by concurrent shim processes).
+
+    Parameters:
+        state_dir (str): Directory of the cursor files.
+        key (str): Cursor name (e.g., device serial number).
+        step (int): Number of samples consumed.
+
+    Returns:
+        int: Trace position before the update.
+    """
+
+    with open(os.path.join(state_dir, f"{key}.cursor"), "a+") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        file.seek(0)
+        content = file.read().strip()
+        # New devices start at a position derived from their name, so that devices differ
+        cursor = int(content) if content else zlib.crc32(key.encode()) % 100000
+        file.seek(0)
+        file.truncate()
+        file.write(str(cursor + step))
+
+    return cursor
+
+def read_trace(bin_dir, name, index, count):
+    """
+    Reads consecutive samples of a trace file, wrapping around at its end.
+
+    Parameters:
+        bin_dir (str): Emulator directory.
+        name (str): Trace name (e.g., cell_info, rtt_ms, throughput_bps-tcp-uplink).
+        index (int): Position of the first sample (any non-negative integer).
+        count (int): Number of samples.
+
+    Returns:
+        list: Samples (lists of values for multi-value traces), or None if the trace is not available.
+    """
+
+    typecode, width = TRACE_FORMATS[name.split("-")[0]]
+    trace_path = os.path.join(bin_dir, "trace", f"{name}.bin")
+    if not os.path.exists(trace_path):
+        return None
+
+    # memoryview reads the samples as the array module writes them, without importing it
+    sample_size = memoryview(b"").cast(typecode).itemsize * width
+    n_samples = os.path.getsize(trace_path) // sample_size
+    samples = []
+
+    with open(trace_path, "rb") as file:
+        while len(samples) < count:
+            position = (index + len(samples)) % n_samples
+            file.seek(position * sample_size)
+            data = file.read(min(count - len(samples), n_samples - position) * sample_size)
+            values = memoryview(data).cast(typecode).tolist()
+            if width == 1:
+                samples.extend(values)
+            else:
+                samples.extend(values[i:i + width] for i in range(0, len(values), width))
+
+    return samples
+
+def emulated_sleep(config, seconds):
+    if seconds > 0 and config["time_scale"] > 0:
+        time.sleep(seconds * config["time_scale"])
+
+def inject_faults(config, rng, command):
+    """
+    Applies the configured latency and fails the command with the configured probability.
+
+    Parameters:
+        config (dict): Emulator configuration.
+        rng (random.Random): Random number generator.
+        command (str): Emulated command (used in the error message).
+    """
+
+    latency_ms = config["latency_ms"] + rng.uniform(0, config["jitter_ms"])
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000)
+
+    if rng.random() < config["failure_rate"]:
+        if command == "iperf3":
+            sys.stderr.write('{"error": "unable to connect to server: Connection refused"}\n')
+        else:
+            sys.stderr.write(f"error: closed ({command})\n")
+        sys.exit(1)
+
+def dumpsys(config, rng, bin_dir, serial):
+    """
+    Prints the cell signal section of dumpsys telephony.registry.
+    """
+
+    cursor = next_cursor(os.path.join(bin_dir, "state"), serial)
+    cell_trace = read_trace(bin_dir, "cell_info", cursor, 1)
+
+    if cell_trace:
+        values = cell_trace[0]
+    else:
+        # Slow random walk around a typical 5G NR signal
+        walk = math.sin(cursor / 60) * 3 + rng.gauss(0, 0.5)
+        values = [78, round(-81 + walk), -11, round(34 + walk), 3]
+
+    sample = dict(zip(["mBands", "ssRsrp", "ssRsrq", "ssSinr", "level"], values))
+    sys.stdout.write(DUMPSYS_TEMPLATE.format(**sample))
+
+def net_dev(config, rng, bin_dir, serial):
+    """
+    Prints /proc/net/dev, with the byte counters of the mobile data interface advanced by the
+    throughput of the emulated time elapsed since the previous call of the device.
+    """
+
+    with open(os.path.join(bin_dir, "state", f"{serial}.netdev"), "a+") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        file.seek(0)
+        content = file.read().split()
+        now = time.time()
+        last_time, rx_bytes, tx_bytes = (float(content[0]), int(content[1]), int(content[2])) if content else (now, 0, 0)
+
+        # With time_scale 0, every call advances the emulated time by one second
+        scale = config["time_scale"]
+        seconds = (now - last_time) / scale if scale > 0 else 1
+        if content and seconds > 0:
+            cursor = next_cursor(os.path.join(bin_dir, "state"), f"{serial}-netdev", max(int(seconds), 1))
+            for direction, index in (("uplink", 0), ("downlink", 1)):
+                bps_trace = read_trace(bin_dir, f"throughput_bps-tcp-{direction}", cursor, 1)
+                bps = bps_trace[0] if bps_trace else MEAN_THROUGHPUT_BPS["tcp"][index] * rng.lognormvariate(0, 0.05)
+                if direction == "uplink":
+                    tx_bytes += int(bps * seconds / 8)
+                else:
+                    rx_bytes += int(bps * seconds / 8)
+
+        file.seek(0)
+        file.truncate()
+        file.write(f"{now} {rx_bytes} {tx_bytes}")
+
+    sys.stdout.write(NET_DEV_HEADER)
+    sys.stdout.write(f"    lo:{8420:>8} {84:>7}    0    0    0     0          0         0 {8420:>8} {84:>7}    0    0    0     0       0          0\n")
+    sys.stdout.write(
+        f"rmnet_data0:{rx_bytes:>12} {rx_bytes // 1400:>8}    0    0    0     0          0         0 "
+        f"{tx_bytes:>12} {tx_bytes // 1400:>8}    0    0    0     0       0          0\n"
+    )
+
+def ping(config, rng, bin_dir, args):
+    """
+    Prints the output of ping -D -O (one line per request, as the emulated time advances).
+    """
+
+    count = int(args[args.index("-c") + 1]) if "-c" in args else 4
+    interval = float(args[args.index("-i") + 1]) if "-i" in args else 1.0
+    destination = args[-1]
+    cursor = next_cursor(os.path.join(bin_dir, "state"), "ping", count)
+    rtt_trace = read_trace(bin_dir, "rtt_ms", cursor, count)
+
+    print(f"PING {destination} ({destination}) 56(84) bytes of data.", flush=True)
+
+    rtts_ms = []
+    for seq in range(1, count + 1):
+        if seq > 1:
+            emulated_sleep(config, interval)
+
+        prefix = f"[{time.time():.6f}] " if "-D" in args else ""
+        draw = rng.random()
+        if draw < config["ping_unreachable_rate"]:
+            print(f"{prefix}From {GATEWAY_IP} icmp_seq={seq} Destination Host Unreachable", flush=True)
+        elif draw < config["ping_unreachable_rate"] + config["ping_loss_rate"]:
+            if "-O" in args:
+                print(f"{prefix}no answer yet for icmp_seq={seq}", flush=True)
+        else:
+            rtt_ms = round(rtt_trace[seq - 1], 3) if rtt_trace else round(5 + rng.gammavariate(4, 7), 1)
+            rtts_ms.append(rtt_ms)
+            print(f"{prefix}64 bytes from {destination}: icmp_seq={seq} ttl=62 time={rtt_ms} ms", flush=True)
+
+    loss_percent = round(100 * (1 - len(rtts_ms) / count))
+    print(f"\n--- {destination} ping statistics ---")
+    print(f"{count} packets transmitted, {len(rtts_ms)} received, {loss_percent}% packet loss, time {int((count - 1) * interval * 1000)}ms")
+    if rtts_ms:
+        mean = sum(rtts_ms) / len(rtts_ms)
+        mdev = math.sqrt(sum((rtt - mean) ** 2 for rtt in rtts_ms) / len(rtts_ms))
+        print(f"rtt min/avg/max/mdev = {min(rtts_ms):.3f}/{mean:.3f}/{max(rtts_ms):.3f}/{mdev:.3f} ms")
+
+    sys.exit(0 if len(rtts_ms) == count else 1)
+
+def sum_streams(streams, start, end):
+    """
+    Adds up the streams of one direction, as the "sum" entries of an iperf3 report.
+
+    Parameters:
+        streams (list): Stream entries (with bytes, and packets or retransmits), all in the same direction.
+        start (float): Start of the summed period (s).
+        end (float): End of the summed period (s).
+
+    Returns:
+        dict: Sum entry, with the aggregate throughput of the streams.
+    """
+
+    total_bytes = sum(stream["bytes"] for stream in streams)
+    # Without interval reports (-i 0), the period is empty and the stream throughputs are added up
+    seconds = end - start
+    bps = total_bytes * 8 / seconds if seconds > 0 else sum(stream["bits_per_second"] for stream in streams)
+    total = {
+        "start": start,
+        "end": end,
+        "seconds": seconds,
+        "bytes": total_bytes,
+        "bits_per_second": bps,
+    }
+    for counter in ("packets", "retransmits"):
+        if counter in streams[0]:
+            total[counter] = sum(stream[counter] for stream in streams)
+    total["omitted"] = False
+    total["sender"] = streams[0]["sender"]
+
+    return total
+
+def iperf3(config, rng, bin_dir, args):
+    """
+    Prints the JSON report of an iperf3 client run (iperf3 -J).
+    """
+
+    duration = int(args[args.index("-t") + 1]) if "-t" in args else 10
+    interval = float(args[args.index("-i") + 1]) if "-i" in args else 1.0
+    server = args[args.index("-c") + 1] if "-c" in args else "127.0.0.1"
+    port = int(args[args.index("-p") + 1]) if "-p" in args else 5201
+    protocol = "udp" if "-u" in args else "tcp"
+    n_intervals = max(int(duration / interval), 1) if interval > 0 else 1
+
+    if "--bidir" in args:
+        streams = [(5, True), (7, False)]
+    elif "-R" in args:
+        streams = [(5, False)]
+    else:
+        streams = [(5, True)]
+
+    start_time = int(time.time())
+    cursor = next_cursor(os.path.join(bin_dir, "state"), f"iperf3-{protocol}", n_intervals)
+    stream_bps = {}
+    for socket, sender in streams:
+        direction = "uplink" if sender else "downlink"
+        bps_trace = read_trace(bin_dir, f"throughput_bps-{protocol}-{direction}", cursor, n_intervals)
+        if bps_trace:
+            stream_bps[socket] = bps_trace
+        else:
+            mean_bps = MEAN_THROUGHPUT_BPS[protocol][0 if sender else 1]
+            stream_bps[socket] = [mean_bps * rng.lognormvariate(0, 0.05) for _ in range(n_intervals)]
+
+    intervals = []
+    for i in range(n_intervals):
+        emulated_sleep(config, interval)
+        interval_streams = []
+        for socket, sender in streams:
+            bps = stream_bps[socket][i]
+            stream = {
+                "socket": socket,
+                "start": i * interval,
+                "end": (i + 1) * interval,
+                "seconds": interval,
+                "bytes": int(bps * interval / 8),
+                "bits_per_second": bps,
+                "omitted": False,
+                "sender": sender,
+            }
+            if protocol == "udp":
+                stream["packets"] = stream["bytes"] // 1348
+            else:
+                stream["retransmits"] = 0
+            interval_streams.append(stream)
+
+        # "sum" adds up the streams of the first direction, "sum_bidir_reverse" those of the other one
+        interval_entry = {"streams": interval_streams}
+        for key, forward in (("sum", True), ("sum_bidir_reverse", False)):
+            direction_streams = [stream for stream in interval_streams if (stream["sender"] == streams[0][1]) == forward]
+            if direction_streams:
+                interval_entry[key] = sum_streams(direction_streams, i * interval, (i + 1) * interval)
+        intervals.append(interval_entry)
+
+    report = {
+        "start": {
+            "connected": [
+                {"socket": socket, "local_host": UE_IP, "local_port": 37000 + socket, "remote_host": server, "remote_port": port}
+                for socket, _ in streams
+            ],
+            "version": "iperf 3.9",
+            "timestamp": {
+                "time": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(start_time)),
+                "timesecs": start_time,
+            },
+            "connecting_to": {"host": server, "port": port},
+            "test_start": {
+                "protocol": protocol.upper(),
+                "num_streams": 1,
+                "blksize": 1348 if protocol == "udp" else 131072,
+                "omit": 0,
+                "duration": duration,
+                "bytes": 0,
+                "blocks": 0,
+                "reverse": int("-R" in args),
+                "tos": 0,
+            },
+        },
+        "intervals": intervals,
+        "end": {},
+    }
+    for key in ("sum", "sum_bidir_reverse"):
+        if key in intervals[0]:
+            report["end"][key] = sum_streams([entry[key] for entry in intervals], 0, n_intervals * interval)
+
+    import json
+
+    json.dump(report, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+def ssh(config, rng, args):
+    """
+    Runs the command of an ssh invocation locally (loopback log server).
+
+    A failure (--failure-rate) drops the connection after a random part of the standard
+    input was delivered to the command, as an interrupted transfer.
+    """
+
+    index = 0
+    while index < len(args) and args[index].startswith("-"):
+        index += 2 if len(args[index]) == 2 and args[index][1] in SSH_VALUE_OPTIONS else 1
+    command = " ".join(args[index + 1:])
+    if index >= len(args) or not command:
+        sys.stderr.write("emulator: ssh requires a host and a command\n")
+        sys.exit(255)
+
+    latency_ms = config["latency_ms"] + rng.uniform(0, config["jitter_ms"])
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000)
+
+    if rng.random() >= config["failure_rate"]:
+        sys.stdout.flush()
+        os.execvp("sh", ["sh", "-c", command])
+
+    import subprocess
+
+    data = sys.stdin.buffer.read()
+    process = subprocess.Popen(["sh", "-c", command], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+    process.communicate(data[:int(len(data) * rng.random())])
+    sys.stderr.write(f"Connection to {args[index]} closed by remote host.\n")
+    sys.exit(255)
+
+def run_command(command, args):
+    """
+    Emulates a shim command (adb, ping, iperf3 or ssh).
+
+    Parameters:
+        command (str): Shim name.
+        args (list): Command line arguments of the shim.
+    """
+
+    bin_dir = os.environ["REPLICA_EMULATOR_DIR"]
+    with open(os.path.join(bin_dir, CONFIG_FILE), "rb") as file:
+        config = marshal.load(file)
+
+    # With a seed, each invocation gets its own reproducible random stream
+    seed = config["seed"]
+    rng = random.Random(None if seed is None else f"{seed}-{next_cursor(os.path.join(bin_dir, 'state'), 'invocations')}")
+
+    if command == "adb":
+        serial = args[args.index("-s") + 1] if "-s" in args else "emulator-5554"
+        if "shell" not in args:
+            sys.stderr.write("emulator: only 'adb shell' is supported\n")
+            sys.exit(1)
+        shell_args = args[args.index("shell") + 1:]
+        inject_faults(config, rng, "adb")
+
+        if shell_args[:2] == ["dumpsys", "telephony.registry"]:
+            dumpsys(config, rng, bin_dir, serial)
+        elif shell_args == ["cat", "/proc/net/dev"]:
+            net_dev(config, rng, bin_dir, serial)
+        elif shell_args and shell_args[0] == "ping":
+            ping(config, rng, bin_dir, shell_args[1:])
+        elif shell_args and "iperf3" in os.path.basename(shell_args[0]):
+            iperf3(config, rng, bin_dir, shell_args[1:])
+        else:
+            sys.stderr.write(f"emulator: unsupported shell command: {' '.join(shell_args)}\n")
+            sys.exit(127)
+
+    elif command == "ping":
+        inject_faults(config, rng, "ping")
+        ping(config, rng, bin_dir, args)
+
+    elif command == "iperf3":
+        inject_faults(config, rng, "iperf3")
+        iperf3(config, rng, bin_dir, args)
+
+    elif command == "ssh":
+        ssh(config, rng, args)
+
+def parse_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+                        prog='emulator.py',
+                        formatter_class=argparse.RawDescriptionHelpFormatter,
+                        description=('''\
+
+    Description: Installs adb, ping, iperf3 and ssh shims that emulate the UE and the log server, to run
+                 the collectors without hardware.
+
+    Example: python3 emulator.py install /tmp/emulator --trace ../logs/logs_22_02 --time-scale 0
+             PATH=/tmp/emulator:$PATH python3 logger.py -i 0 -t 1000 --no-transfer
+    '''),
+                        add_help=True)
+
+    parser.add_argument('action', choices=['install'], help='install the shims and the configuration')
+    parser.add_argument('bin_dir', help='directory of the shims (to be prepended to PATH)')
+    parser.add_argument('--trace', metavar='dir', help='campaign directory replayed by the emulator (e.g., ../logs/logs_22_02); generated signals by default', dest='trace')
+    parser.add_argument('--latency-ms', metavar='ms', type=float, help='delay added to every command (default = 0)', dest='latency_ms', default=0)
+    parser.add_argument('--jitter-ms', metavar='ms', type=float, help='maximum random delay added to the latency (default = 0)', dest='jitter_ms', default=0)
+    parser.add_argument('--failure-rate', metavar='p', type=float, help='probability of a command failure (default = 0)', dest='failure_rate', default=0)
+    parser.add_argument('--ping-loss-rate', metavar='p', type=float, help='probability of a ping request without answer (default = 0)', dest='ping_loss_rate', default=0)
+    parser.add_argument('--ping-unreachable-rate', metavar='p', type=float, help='probability of a destination unreachable reply (default = 0)', dest='ping_unreachable_rate', default=0)
+    parser.add_argument('--time-scale', metavar='factor', type=float, help='real seconds per emulated second; 0 answers immediately (default = 1)', dest='time_scale', default=1.0)
+    parser.add_argument('--seed', metavar='seed', type=int, help='random seed', dest='seed')
+
+    return parser.parse_args()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SHIMS:
+        run_command(sys.argv[1], sys.argv[2:])
+        return
+
+    args = parse_args()
+
+    config = {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "failure_rate": args.failure_rate,
+        "ping_loss_rate": args.ping_loss_rate,
+        "ping_unreachable_rate": args.ping_unreachable_rate,
+        "time_scale": args.time_scale,
+        "seed": args.seed,
+    }
+    trace = load_trace(args.trace) if args.trace else {}
+
+    install(args.bin_dir, config, trace)
+
+    print(f"Emulator installed in {args.bin_dir} ({len(trace.get('cell_info', [])) // 5} cell samples, "
+          f"{len(trace.get('rtt_ms', []))} RTTs replayed). Run the collectors with:")
+    print(f"    PATH={os.path.abspath(args.bin_dir)}:$PATH python3 logger.py -i 0 -t 10 --no-transfer")
+
+if __name__ == '__main__':
+    main()
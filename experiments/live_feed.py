@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+import json
+import os
+import time
+
+class LiveFeed:
+    """
+    JSON Lines feed of the samples of the collectors, read by live_view.py while logging.
+
+    Each record has the UNIX time, the device serial number and the sampled metrics, e.g.:
+        {"time": 1740142801.1, "device": "A75259FRCN9A2DV0538", "ssRsrp": -81, "ssSinr": 34}
+
+    Several collector processes can publish to the same feed: each record is written with a
+    single write() on a file opened in append mode, so records are never interleaved.
+    """
+
+    def __init__(self, path, device):
+        """
+        Parameters:
+            path (str): Feed file (None disables the feed).
+            device (str): Device serial number of the published records.
+        """
+        self.device = device
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644) if path else None
+
+    def publish(self, **metrics):
+        """
+        Appends a record with the current time.
+
+        Parameters:
+            metrics: Metric names and values (e.g., rtt_ms=23.4).
+        """
+        if self.fd is None:
+            return
+        record = {"time": metrics.pop("time", None) or time.time(), "device": self.device, **metrics}
+        os.write(self.fd, (json.dumps(record) + "\n").encode())
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def follow_feed(path, poll_interval=0.5, stop=None):
+    """
+    Reads the records of a feed as they are appended (like tail -F).
+
+    Only complete lines are parsed; the feed does not need to exist yet, and it is read
+    again from the beginning if it is truncated or replaced.
+
+    Parameters:
+        path (str): Feed file.
+        poll_interval (float): Time (in seconds) to wait for new records.
+        stop (callable): Optional function; reading stops when it returns True.
+
+    Yields:
+        dict: Feed records, or None when no new record arrived during poll_interval.
+    """
+
+    offset = 0
+    inode = None
+    pending = b""
+
+    while stop is None or not stop():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            time.sleep(poll_interval)
+            yield None
+            continue
+
+        if stat.st_ino != inode or stat.st_size < offset:
+            inode, offset, pending = stat.st_ino, 0, b""
+
+        if stat.st_size == offset:
+            time.sleep(poll_interval)
+            yield None
+            continue
+
+        with open(path, "rb") as feed:
+            feed.seek(offset)
+            data = feed.read()
+        offset += len(data)
+
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from live_feed import follow_feed
+
+# Metrics shown first (other numeric metrics of the feed follow, in alphabetical order)
+METRIC_ORDER = ["uplink_mbps", "downlink_mbps", "rtt_ms", "ping_loss", "ssRsrp", "ssRsrq", "ssSinr", "level"]
+
+class RollingWindow:
+    """
+    Samples of a metric received during the last window seconds.
+
+    Sum and sum of squares are updated as samples enter and leave the window, so adding
+    a sample costs O(1) (amortized) regardless of the window length.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.samples = deque()
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.last = None
+        self.last_time = None
+
+    def add(self, t, value):
+        """
+        Parameters:
+            t (float): Sample time (UNIX time).
+            value (float): Sample value.
+        """
+        self.samples.append((t, value))
+        self.sum += value
+        self.sum_sq += value * value
+        if self.last_time is None or t >= self.last_time:
+            self.last, self.last_time = value, t
+        self.expire(t)
+
+    def expire(self, now):
+        """
+        Removes the samples older than the window.
+
+        Parameters:
+            now (float): Current time (UNIX time).
+        """
+        while self.samples and self.samples[0][0] < now - self.window:
+            _, value = self.samples.popleft()
+            self.sum -= value
+            self.sum_sq -= value * value
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of samples, mean, standard deviation, min, max and last value.
+        """
+        n = len(self.samples)
+        mean = self.sum / n if n else None
+        std = math.sqrt(max(self.sum_sq / n - mean * mean, 0.0)) if n else None
+        values = [value for _, value in self.samples]
+        return {
+            "n": n,
+            "mean": mean,
+            "std": std,
+            "min": min(values) if values else None,
+            "max": max(values) if values else None,
+            "last": self.last,
+        }
+
+class LiveAggregator:
+    """
+    Rolling windows of every metric of every device of a live feed.
+    """
+
+    def __init__(self, window, stale_after):
+        """
+        Parameters:
+            window (float): Window length (in seconds).
+            stale_after (float): Time (in seconds) without records after which a device is flagged.
+        """
+        self.window = window
+        self.stale_after = stale_after
+        self.windows = {}
+        self.last_seen = {}
+        self.n_records = 0
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        """
+        Adds the metrics of a feed record (every numeric field besides time and device).
+
+        Parameters:
+            record (dict): Feed record.
+        """
+        t = record.get("time") or time.time()
+        device = record.get("device", "unknown")
+
+        with self.lock:
+            self.n_records += 1
+            self.last_seen[device] = max(self.last_seen.get(device, t), t)
+            for metric, value in record.items():
+                if metric in ("time", "device") or not isinstance(value, (int, float)):
+                    continue
+                key = (device, metric)
+                if key not in self.windows:
+                    self.windows[key] = RollingWindow(self.window)
+                self.windows[key].add(t, float(value))
+
+    def snapshot(self, now=None):
+        """
+        Parameters:
+            now (float): Current time (UNIX time); by default, the current clock.
+
+        Returns:
+            dict: Per-device age of the last record, stale flag and metric statistics.
+        """
+        now = now or time.time()
+
+        with self.lock:
+            devices = {}
+            for device, last_seen in sorted(self.last_seen.items()):
+                age = now - last_seen
+                devices[device] = {"age_s": age, "stale": age > self.stale_after, "metrics": {}}
+
+            for (device, metric), window in self.windows.items():
+                window.expire(now)
+                devices[device]["metrics"][metric] = window.stats()
+
+            return {"time": now, "window_s": self.window, "records": self.n_records, "devices": devices}
+
+def metric_sort_key(metric):
+    return (METRIC_ORDER.index(metric), "") if metric in METRIC_ORDER else (len(METRIC_ORDER), metric)
+
+def render_text(snapshot):
+    """
+    Formats a snapshot as a text table.
+
+    Parameters:
+        snapshot (dict): Aggregator snapshot.
+
+    Returns:
+        str: Text view.
+    """
+
+    def fmt(value):
+        return f"{value:10.2f}" if value is not None else f"{'-':>10}"
+
+    lines = [
+        f"REPLICA live view - {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['time']))} - "
+        f"last {snapshot['window_s']:.0f} s - {snapshot['records']} records"
+    ]
+
+    if not snapshot["devices"]:
+        lines.append("Waiting for records...")
+
+    for device, info in snapshot["devices"].items():
+        status = "STALE" if info["stale"] else "ok"
+        lines.append("")
+        lines.append(f"{device}  (last record {info['age_s']:.1f} s ago, {status})")
+        lines.append(f"  {'metric':<14} {'n':>6} {'mean':>10} {'std':>10} {'min':>10} {'max':>10} {'last':>10}")
+        for metric in sorted(info["metrics"], key=metric_sort_key):
+            stats = info["metrics"][metric]
+            lines.append(
+                f"  {metric:<14} {stats['n']:>6} {fmt(stats['mean'])} {fmt(stats['std'])} "
+                f"{fmt(stats['min'])} {fmt(stats['max'])} {fmt(stats['last'])}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+def serve_http(aggregator, port):
+    """
+    Serves the aggregator on localhost: / (text view) and /json (snapshot), in a background thread.
+
+    Parameters:
+        aggregator (LiveAggregator): Aggregator.
+        port (int): TCP port.
+
+    Returns:
+        ThreadingHTTPServer: Running server.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            snapshot = aggregator.snapshot()
+            if self.path.rstrip("/") == "/json":
+                body, content_type = json.dumps(snapshot).encode(), "application/json"
+            elif self.path in ("/", "/text"):
+                body, content_type = render_text(snapshot).encode(), "text/plain; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+                        prog='live_view.py',
+                        formatter_class=argparse.RawDescriptionHelpFormatter,
+                        description=('''\
+
+    Description: Shows rolling statistics (throughput, RTT, RSRP, SINR, ...) of each device while
+                 logger.py runs, from its live feed (logger.py --live-feed FILE).
+
+    Example: python3 live_view.py live-feed.jsonl --http 8080
+    '''),
+                        add_help=True)
+
+    parser.add_argument('feed', help='live feed file written by logger.py --live-feed')
+    parser.add_argument('-w', '--window', metavar='seconds', type=float, help='length of the rolling windows (default = 60s)', dest='window', default=60)
+    parser.add_argument('--stale', metavar='seconds', type=float, help='flag devices without records for this time (default = 10s)', dest='stale', default=10)
+    parser.add_argument('--refresh', metavar='seconds', type=float, help='refresh interval of the terminal view (default = 1s)', dest='refresh', default=1)
+    parser.add_argument('--http', metavar='port', type=int, help='serve the view on http://127.0.0.1:PORT/ (text) and /json', dest='http')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not show the terminal view', dest='quiet')
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    aggregator = LiveAggregator(args.window, args.stale)
+
+    if args.http:
+        serve_http(aggregator, args.http)
+        print(f"Serving the live view on http://127.0.0.1:{args.http}/ (text) and /json")
+
+    next_refresh = time.monotonic()
+
+    try:
+        for record in follow_feed(args.feed, poll_interval=min(args.refresh, 0.5)):
+            if record is not None:
+                aggregator.add(record)
+
+            if not args.quiet and time.monotonic() >= next_refresh:
+                # Clear the terminal and redraw
+                sys.stdout.write("\033[2J\033[H" + render_text(aggregator.snapshot()))
+                sys.stdout.flush()
+                next_refresh = time.monotonic() + args.refresh
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -2,94 +2,216 @@
 import subprocess
 import json
 import time
-import statistics
 import re
 import argparse
 import sys
-import glob
 from concurrent.futures import ProcessPoolExecutor
 
-def cell_info(host_ip, device_serial, c, X):
+from live_feed import LiveFeed
+from ping_collector import collect_ping
+from transfer import transfer_logs
+
+CELL_INFO_FIELDS = ["mBands", "ssRsrp", "ssRsrq", "ssSinr", "level"]
+
+CELL_INFO_PATTERNS = {
+    "mBands": re.compile(r"mBands = \[(\d+)\]"),
+    "ssRsrp": re.compile(r"ssRsrp = ([-\d]+)"),
+    "ssRsrq": re.compile(r"ssRsrq = ([-\d]+)"),
+    "ssSinr": re.compile(r"ssSinr = ([-\d]+)"),
+    "level": re.compile(r"level = (\d+)"),
+}
+
+CELL_INFO_PERCENTILES = [5, 25, 50, 75, 95]
+
+# Interface name, received bytes and transmitted bytes of a /proc/net/dev line
+NET_DEV_PATTERN = re.compile(r'^\s*([^\s:]+):\s*(\d+)(?:\s+\d+){7}\s+(\d+)', re.MULTILINE)
+
+# Cell info metrics published to the live feed
+CELL_INFO_LIVE_FIELDS = ["ssRsrp", "ssRsrq", "ssSinr", "level"]
+
+class OnlineStats:
+    """
+    Bounded-memory statistics of an integer signal, updated one sample at a time.
+
+    Mean and variance use Welford's algorithm. Percentiles use a histogram of the
+    sample values: cell info metrics are integers within a small range (e.g., RSRP
+    between -156 and -31 dBm), so the histogram is exact and its size does not
+    depend on the number of samples.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.histogram = {}
+
+    def update(self, value):
+        """
+        Add a sample.
+
+        Parameters:
+            value (int): Sample value.
+        """
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.histogram[value] = self.histogram.get(value, 0) + 1
+
+    def stdev(self):
+        """
+        Returns:
+            float: Sample standard deviation (0 with less than two samples).
+        """
+        return (self.m2 / (self.n - 1)) ** 0.5 if self.n > 1 else 0
+
+    def percentile(self, p):
+        """
+        Parameters:
+            p (float): Percentile, between 0 and 100.
+
+        Returns:
+            int: Nearest-rank percentile of the samples (None without samples).
+        """
+        if self.n == 0:
+            return None
+        rank = max(1, -(-p * self.n // 100))
+        cumulative = 0
+        for value in sorted(self.histogram):
+            cumulative += self.histogram[value]
+            if cumulative >= rank:
+                return value
+
+def cell_info(host_ip, device_serial, c, X, output_file, live_feed=None):
     """
     Collects cellular signal data (bands, signal strength and level) from an Android device.
+
+    Samples are written to the output file as they are collected. Consecutive identical
+    samples are stored as a single run-length encoded record ("iteration" is the first
+    iteration of the run and "count" its length), and statistics are computed online,
+    so memory use does not grow with the number of samples.
     
     Parameters:
         host_ip (str): IP address of the host running ADB.
         device_serial (str): Serial number of the Android device.
         c (int): Number of times to collect samples.
         X (int): Interval (in seconds) between each sample collection.
+        output_file (str): Path of the JSON output file (raw samples and calculated statistics).
+        live_feed (str): Optional live feed file where each sample is also published (see live_view.py).
     
     Returns:
-        str: JSON-formatted string with raw samples and calculated statistics.
+        int: Number of collected samples.
     """
      
     command = ['adb', '-H', host_ip, '-s', device_serial, 'shell', 'dumpsys', 'telephony.registry']
+    feed = LiveFeed(live_feed, device_serial)
+
+    stats = {field: OnlineStats() for field in CELL_INFO_FIELDS}
+    n_samples = 0
+    n_records = 0
+    run = None
+
+    with open(output_file, "w") as outfile:
+        general_info = {"host_ip": host_ip, "device_serial": device_serial}
+        outfile.write('{"general_info": ' + json.dumps(general_info) + ', "samples": [')
+
+        def write_run(run):
+            outfile.write((",\n" if n_records else "\n") + json.dumps(run))
+            outfile.flush()
+
+        for _ in range(c):
+            try:
+                result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                cell_info = result.stdout.decode('utf-8')
+            except subprocess.CalledProcessError as e:
+                print(f"Cell info command failed with return code {e.returncode}: {e.stderr.decode('utf-8')}")
+                continue  
+
+            sample = {field: int(pattern.search(cell_info).group(1)) for field, pattern in CELL_INFO_PATTERNS.items()}
+            n_samples += 1
+            feed.publish(**{field: sample[field] for field in CELL_INFO_LIVE_FIELDS})
+
+            for field in CELL_INFO_FIELDS:
+                stats[field].update(sample[field])
+
+            if run is not None and all(run[field] == sample[field] for field in CELL_INFO_FIELDS):
+                run["count"] += 1
+            else:
+                if run is not None:
+                    write_run(run)
+                    n_records += 1
+                run = {"iteration": n_samples, "count": 1, **sample}
+
+            time.sleep(X)
+
+        if run is not None:
+            write_run(run)
+
+        statistics = {
+            "mean": {field: stats[field].mean if stats[field].n else None for field in CELL_INFO_FIELDS},
+            "std_dev": {field: stats[field].stdev() for field in CELL_INFO_FIELDS},
+            "min": {field: stats[field].min for field in CELL_INFO_FIELDS},
+            "max": {field: stats[field].max for field in CELL_INFO_FIELDS},
+            "percentiles": {
+                f"p{p}": {field: stats[field].percentile(p) for field in CELL_INFO_FIELDS}
+                for p in CELL_INFO_PERCENTILES
+            },
+            "n_samples": n_samples,
+        }
+        outfile.write('\n], "statistics": ' + json.dumps(statistics) + '}\n')
 
-    mBands_samples = []
-    ssRsrp_samples = []
-    ssRsrq_samples = []
-    ssSinr_samples = []
-    level_samples = []
+    feed.close()
+    return n_samples
 
-    for _ in range(c):
+def traffic(device_serial, c, X, live_feed):
+    """
+    Publishes the uplink and downlink throughput of an Android device to the live feed.
+
+    The throughput is computed from the byte counters of the device network interfaces
+    (/proc/net/dev), since the iperf3 JSON report is only available at the end of the test.
+
+    Parameters:
+        device_serial (str): Serial number of the Android device.
+        c (int): Number of times to collect samples.
+        X (int): Interval (in seconds) between each sample collection.
+        live_feed (str): Live feed file (see live_view.py).
+    """
+
+    command = ['adb', '-s', device_serial, 'shell', 'cat', '/proc/net/dev']
+    feed = LiveFeed(live_feed, device_serial)
+    previous = None
+
+    for _ in range(c + 1):
         try:
-            result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            cell_info = result.stdout.decode('utf-8')
+            result = subprocess.run(command, check=True, capture_output=True, text=True)
         except subprocess.CalledProcessError as e:
-            print(f"Cell info command failed with return code {e.returncode}: {e.stderr.decode('utf-8')}")
-            continue  
-
-        mBands = int(re.search(r"mBands = \[(\d+)\]", cell_info).group(1))
-        ssRsrp = int(re.search(r"ssRsrp = ([-\d]+)", cell_info).group(1))
-        ssRsrq = int(re.search(r"ssRsrq = ([-\d]+)", cell_info).group(1))
-        ssSinr = int(re.search(r"ssSinr = ([-\d]+)", cell_info).group(1))
-        level = int(re.search(r"level = (\d+)", cell_info).group(1))
-        
-        mBands_samples.append(mBands)
-        ssRsrp_samples.append(ssRsrp)
-        ssRsrq_samples.append(ssRsrq)
-        ssSinr_samples.append(ssSinr)
-        level_samples.append(level)
+            print(f"Traffic command failed with return code {e.returncode}: {e.stderr}")
+            time.sleep(X)
+            continue
+
+        now = time.time()
+        rx_bytes = tx_bytes = 0
+        for match in NET_DEV_PATTERN.finditer(result.stdout):
+            if match.group(1) != 'lo':
+                rx_bytes += int(match.group(2))
+                tx_bytes += int(match.group(3))
+
+        if previous is not None and now > previous[0]:
+            elapsed = now - previous[0]
+            feed.publish(
+                time=now,
+                uplink_mbps=max(tx_bytes - previous[2], 0) * 8 / elapsed / 1e6,
+                downlink_mbps=max(rx_bytes - previous[1], 0) * 8 / elapsed / 1e6,
+            )
+        previous = (now, rx_bytes, tx_bytes)
 
         time.sleep(X)
 
-    stats = {
-        "mean": {
-            "mBands": statistics.mean(mBands_samples),
-            "ssRsrp": statistics.mean(ssRsrp_samples),
-            "ssRsrq": statistics.mean(ssRsrq_samples),
-            "ssSinr": statistics.mean(ssSinr_samples),
-            "level": statistics.mean(level_samples),
-        },
-        "std_dev": {
-            "mBands": statistics.stdev(mBands_samples) if len(mBands_samples) > 1 else 0,
-            "ssRsrp": statistics.stdev(ssRsrp_samples) if len(ssRsrp_samples) > 1 else 0,
-            "ssRsrq": statistics.stdev(ssRsrq_samples) if len(ssRsrq_samples) > 1 else 0,
-            "ssSinr": statistics.stdev(ssSinr_samples) if len(ssSinr_samples) > 1 else 0,
-            "level": statistics.stdev(level_samples) if len(level_samples) > 1 else 0,
-        }
-    }
-
-    output = {
-        "general_info": {
-            "host_ip": host_ip,
-            "device_serial": device_serial,
-        },
-        "samples": [
-            {
-                "iteration": i + 1,
-                "mBands": mBands_samples[i],
-                "ssRsrp": ssRsrp_samples[i],
-                "ssRsrq": ssRsrq_samples[i],
-                "ssSinr": ssSinr_samples[i],
-                "level": level_samples[i]
-            }
-            for i in range(len(mBands_samples))
-        ],
-        "statistics": stats
-    }
-    
-    return json.dumps(output, indent=4)
+    feed.close()
 
 def iperf3(device_serial, server, duration, interval, bitrate, port=5201, udp=False, reverse=False, bidirectional=False):
     """
@@ -132,89 +254,37 @@ def iperf3(device_serial, server, duration, interval, bitrate, port=5201, udp=Fa
         except json.JSONDecodeError:
             print(e.stderr.decode())
 
-def ping(device_serial, count, destination):
+def ping(device_serial, count, destination, live_feed=None):
     """
     Sends ping requests from an Android device to a specified destination.
+
+    The output is parsed line by line as the replies arrive (see ping_collector.py). Each
+    response has the UNIX time at which it was received, and requests without answer are
+    recorded as timeout or unreachable responses.
     
     Parameters:
         device_serial (str): Serial number of the Android device.
         count (int): Number of ping requests to send.
         destination (str): IP address or hostname to ping.
+        live_feed (str): Optional live feed file where each response is also published (see live_view.py).
     
     Returns:
         dict: Parsed information about ping responses and round-trip statistics.
     """
         
-    command = ['adb', '-s', device_serial, 'shell','ping', '-c', str(count), destination]
-    
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        ping_output = result.stdout
-        
-        parsed_ping = {
-            "destination_ip": None,
-            "data_bytes": None,
-            "destination": destination,
-            "packets_transmitted": None,
-            "packets_received": None,
-            "packet_loss_percent": None,
-            "time_ms": None,
-            "round_trip_ms_min": None,
-            "round_trip_ms_avg": None,
-            "round_trip_ms_max": None,
-            "round_trip_ms_stddev": None,
-            "responses": [],
-        }
+    command = ['adb', '-s', device_serial, 'shell', 'ping', '-D', '-O', '-c', str(count), destination]
+    feed = LiveFeed(live_feed, device_serial)
 
-        header_match = re.search(
-            r'^PING\s+([a-zA-Z0-9\.-]+)\s+\(([\d.:]+)\)\s+(\d+)\((\d+)\)\s+bytes of data',
-            ping_output,
-            re.MULTILINE
-        )
-        if header_match:
-            parsed_ping["destination_ip"] = header_match.group(2)
-            parsed_ping["data_bytes"] = int(header_match.group(3))
-        
-        response_matches = re.findall(
-            r'(\d+)\s+bytes from\s+[\w.-]*\s*\(?([\d.]+)\)?:\s+icmp_seq=(\d+)\s+ttl=(\d+)\s+time=([\d.]+)\s+ms', 
-            ping_output
-        )
-        
-        for match in response_matches:
-            response = {
-                "type": "reply",
-                "bytes": int(match[0]),
-                "response_ip": match[1],
-                "icmp_seq": int(match[2]),
-                "ttl": int(match[3]),
-                "time_ms": float(match[4]),
-            }
-            parsed_ping["responses"].append(response)
-
-        packet_stats = re.search(
-            r'(\d+) packets transmitted, (\d+) received, (\d+)% packet loss, time (\d+)ms',
-            ping_output
-        )
-        if packet_stats:
-            parsed_ping["packets_transmitted"] = int(packet_stats.group(1))
-            parsed_ping["packets_received"] = int(packet_stats.group(2))
-            parsed_ping["packet_loss_percent"] = float(packet_stats.group(3))
-            parsed_ping["time_ms"] = int(packet_stats.group(4))
-
-        rtt_stats = re.search(
-            r'rtt min/avg/max/mdev = ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+)\s+ms',
-            ping_output
-        )
-        if rtt_stats:
-            parsed_ping["round_trip_ms_min"] = float(rtt_stats.group(1))
-            parsed_ping["round_trip_ms_avg"] = float(rtt_stats.group(2))
-            parsed_ping["round_trip_ms_max"] = float(rtt_stats.group(3))
-            parsed_ping["round_trip_ms_stddev"] = float(rtt_stats.group(4))
-        return parsed_ping
+    def publish_response(response):
+        if response["type"] == "reply":
+            feed.publish(time=response.get("timestamp"), rtt_ms=response["time_ms"], ping_loss=0)
+        else:
+            feed.publish(time=response.get("timestamp"), ping_loss=1)
 
-    except subprocess.CalledProcessError as e:
-        print(f"Ping command failed with return code {e.returncode}: {e.stderr}")
-        return None
+    parsed_ping = collect_ping(command, destination, on_record=publish_response)
+    feed.close()
+
+    return parsed_ping
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -234,41 +304,12 @@ def parse_args():
     parser.add_argument('-R', '--reverse', action='store_true', help='run IPERF3 in reverse mode (server sends, client receives)', dest='reverse')
     parser.add_argument('-U','--udp', action='store_true', help='run IPERF3 in UDP rather than TCP', dest='udp')
     parser.add_argument('-B','--bidir', action='store_true', help='run IPERF3 in bidirectional mode', dest='bidir')
+    parser.add_argument('--no-transfer', action='store_true', help='keep the JSON files locally instead of transferring them to the server', dest='no_transfer')
+    parser.add_argument('--transfer-to', metavar='dest', help='destination of the JSON files, local directory or user@host:/path (default = morse@10.11.23.204:/home/morse/logs)', dest='transfer_to')
+    parser.add_argument('--live-feed', metavar='file', help='publish every sample to a JSON Lines feed, read by live_view.py (e.g., live-feed.jsonl)', dest='live_feed')
    
     return parser.parse_args()
 
-def transfer_file(destination):
-    json_files = glob.glob("*.json")
-    if not json_files:
-        print("No JSON files found for transfer.")
-        return None
-
-    command = ["scp"] + json_files + [destination]
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        #print(f"File transfer successful. Output:\n{result.stdout}")
-    except subprocess.CalledProcessError as e:
-        print(f"File transfer failed with error:\n{e.stderr}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-
-def remove_files():
-    json_files = glob.glob("*.json")
-    if not json_files:
-        print("No JSON files found for transfer.")
-        return None
-    
-    command = ['rm', '-r'] + json_files
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        #print(f"Files removed successfully. Output:\n{result.stdout}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while removing files:\n{e.stderr}")
-    except FileNotFoundError:
-        print("Error: 'rm' command not found. Please ensure it is installed and in your PATH.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-
 def main():
     args = parse_args()
    
@@ -286,38 +327,37 @@ def main():
     adb_client = '10.11.32.205'
     timestr = time.strftime("%Y%m%d-%H%M%S")
 
+    file_suffix = "udp-" if udp else ""
+    file_suffix += "reverse-" if reverse else ""
+    file_suffix += "bidir-" if bidir else ""
+    file_suffix += timestr
+
     print("Logging started...")
 
-    with ProcessPoolExecutor() as executor:
+    # One worker per logging task, so all of them run for the whole test
+    with ProcessPoolExecutor(max_workers=5 if args.live_feed else 4) as executor:
         future_iperf3 = executor.submit(iperf3, serial_number1, destination, count, interval, bitrate, port, udp, reverse, bidir)
-        future_ping = executor.submit(ping, serial_number1, count, destination)
-        future_cellinfo = executor.submit(cell_info, adb_client, serial_number1, int(count), int(interval))
-        future_cellinfo2 = executor.submit(cell_info, adb_client, serial_number2, int(count), int(interval))
+        future_ping = executor.submit(ping, serial_number1, count, destination, args.live_feed)
+        future_cellinfo = executor.submit(cell_info, adb_client, serial_number1, int(count), int(interval), f"cell_info-{file_suffix}.json", args.live_feed)
+        future_cellinfo2 = executor.submit(cell_info, adb_client, serial_number2, int(count), int(interval), f"cell_info2-{file_suffix}.json", args.live_feed)
+        if args.live_feed:
+            future_traffic = executor.submit(traffic, serial_number1, int(count), int(interval), args.live_feed)
         
         iperf3json = future_iperf3.result()
         pingjson = future_ping.result()
-        cellinfojson = future_cellinfo.result()
-        cellinfojson2 = future_cellinfo2.result()
+        future_cellinfo.result()
+        future_cellinfo2.result()
+        if args.live_feed:
+            future_traffic.result()
 
-    file_suffix = "udp-" if udp else ""
-    file_suffix += "reverse-" if reverse else ""
-    file_suffix += "bidir-" if bidir else ""
-    file_suffix += timestr
-    
     with open(f"iperf3-{file_suffix}.json", "w") as outfile:
         json.dump(iperf3json, outfile)
 
     with open(f"ping-{file_suffix}.json", "w") as outfile:
         json.dump(pingjson, outfile)
 
-    with open(f"cell_info-{file_suffix}.json", "w") as outfile:
-        outfile.write(cellinfojson)
-    
-    with open(f"cell_info2-{file_suffix}.json", "w") as outfile:
-        outfile.write(cellinfojson2)
-
-    transfer_file(f'morse@{destination}:/home/morse/logs')
-    remove_files()
+    if not args.no_transfer:
+        transfer_logs(args.transfer_to or f'morse@{destination}:/home/morse/logs')
 
     print("Logging finished.")
 
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+import subprocess
+import json
+import re
+from collections import deque
+
+# Optional "[UNIX time]" prefix added by ping -D
+TIMESTAMP_PATTERN = r'^(?:\[(?P<timestamp>\d+\.\d+)\]\s+)?'
+
+PING_PATTERNS = {
+    "header": re.compile(
+        r'^PING\s+(?P<destination>[a-zA-Z0-9\.:-]+)\s+\((?P<destination_ip>[\d.:]+)\)\s+(?P<data_bytes>\d+)\((?P<packet_bytes>\d+)\)\s+bytes of data'
+    ),
+    "reply": re.compile(
+        TIMESTAMP_PATTERN
+        + r'(?P<bytes>\d+)\s+bytes from\s+(?:[\w.-]+\s+\()?(?P<response_ip>[\d.]+)\)?:\s+icmp_seq=(?P<icmp_seq>\d+)\s+ttl=(?P<ttl>\d+)\s+time=(?P<time_ms>[\d.]+)\s+ms'
+    ),
+    "timeout": re.compile(
+        TIMESTAMP_PATTERN + r'(?:no answer yet for icmp_seq=|Request timeout for icmp_seq\s+)(?P<icmp_seq>\d+)'
+    ),
+    "unreachable": re.compile(
+        TIMESTAMP_PATTERN + r'From\s+(?:[\w.-]+\s+\()?(?P<response_ip>[\d.]+)\)?:?\s+icmp_seq=(?P<icmp_seq>\d+)\s+(?P<error>.*Unreachable.*)$'
+    ),
+    "packet_stats": re.compile(
+        r'(?P<packets_transmitted>\d+) packets transmitted, (?P<packets_received>\d+) received,.*?(?P<packet_loss_percent>[\d.]+)% packet loss(?:, time (?P<time_ms>\d+)ms)?'
+    ),
+    "rtt_stats": re.compile(
+        r'(?:rtt|round-trip) min/avg/max/(?:mdev|stddev) = (?P<min>[\d.]+)/(?P<avg>[\d.]+)/(?P<max>[\d.]+)/(?P<stddev>[\d.]+)\s+ms'
+    ),
+}
+
+# Type of each field of the response records
+RESPONSE_FIELD_TYPES = {
+    "timestamp": float,
+    "bytes": int,
+    "response_ip": str,
+    "icmp_seq": int,
+    "ttl": int,
+    "time_ms": float,
+    "error": str,
+}
+
+def parse_ping_line(line):
+    """
+    Parses a line of ping output.
+
+    Parameters:
+        line (str): Line of the ping output (with or without the ping -D timestamp).
+
+    Returns:
+        tuple: Line type (header, reply, timeout, unreachable, packet_stats or rtt_stats)
+               and its typed fields, or (None, None) for other lines.
+    """
+
+    for line_type, pattern in PING_PATTERNS.items():
+        match = pattern.search(line)
+        if match:
+            break
+    else:
+        return None, None
+
+    fields = {key: value for key, value in match.groupdict().items() if value is not None}
+
+    if line_type in ("reply", "timeout", "unreachable"):
+        record = {"type": line_type}
+        record.update({key: RESPONSE_FIELD_TYPES[key](value) for key, value in fields.items()})
+        return line_type, record
+
+    return line_type, fields
+
+def collect_ping(command, destination, on_record=None):
+    """
+    Runs a ping command and parses its output line by line, as the replies arrive.
+
+    Parameters:
+        command (list): Ping command (e.g., ['ping', '-D', '-O', '-c', '10', '10.11.23.204']). The -D
+                        option adds the UNIX time of each reply; -O reports the requests without answer.
+        destination (str): IP address or hostname being pinged.
+        on_record (callable): Optional function called with each response record (reply, timeout or
+                              unreachable) as soon as it is parsed.
+
+    Returns:
+        dict: Parsed information about ping responses and round-trip statistics (None if ping failed).
+    """
+
+    parsed_ping = {
+        "destination_ip": None,
+        "data_bytes": None,
+        "destination": destination,
+        "packets_transmitted": None,
+        "packets_received": None,
+        "packet_loss_percent": None,
+        "time_ms": None,
+        "round_trip_ms_min": None,
+        "round_trip_ms_avg": None,
+        "round_trip_ms_max": None,
+        "round_trip_ms_stddev": None,
+        "responses": [],
+    }
+
+    # stderr is merged into stdout, so that a verbose stderr cannot block the line reader
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    unparsed_lines = deque(maxlen=10)
+
+    for line in process.stdout:
+        line_type, fields = parse_ping_line(line.strip())
+
+        if line_type == "header":
+            parsed_ping["destination_ip"] = fields["destination_ip"]
+            parsed_ping["data_bytes"] = int(fields["data_bytes"])
+        elif line_type == "packet_stats":
+            parsed_ping["packets_transmitted"] = int(fields["packets_transmitted"])
+            parsed_ping["packets_received"] = int(fields["packets_received"])
+            parsed_ping["packet_loss_percent"] = float(fields["packet_loss_percent"])
+            parsed_ping["time_ms"] = int(fields["time_ms"]) if "time_ms" in fields else None
+        elif line_type == "rtt_stats":
+            parsed_ping["round_trip_ms_min"] = float(fields["min"])
+            parsed_ping["round_trip_ms_avg"] = float(fields["avg"])
+            parsed_ping["round_trip_ms_max"] = float(fields["max"])
+            parsed_ping["round_trip_ms_stddev"] = float(fields["stddev"])
+        elif line_type is not None:
+            parsed_ping["responses"].append(fields)
+            if on_record is not None:
+                on_record(fields)
+        elif line.strip():
+            unparsed_lines.append(line.strip())
+
+    returncode = process.wait()
+
+    # ping exits with 1 when some requests were not answered, which is still a valid run
+    if returncode not in (0, 1) or parsed_ping["packets_transmitted"] is None:
+        print(f"Ping command failed with return code {returncode}: {chr(10).join(unparsed_lines)}")
+        return None
+
+    return parsed_ping
+
+def jsonl_writer(records_file):
+    """
+    Creates an on_record callback that appends each record to a JSON Lines file and flushes it.
+
+    Parameters:
+        records_file (file): Open text file.
+
+    Returns:
+        callable: Callback for collect_ping.
+    """
+
+    def write_record(record):
+        records_file.write(json.dumps(record) + "\n")
+        records_file.flush()
+
+    return write_record
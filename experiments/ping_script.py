@@ -1,35 +1,35 @@
 import argparse
-import subprocess
 import json
-import jc  
 import time
 
+from ping_collector import collect_ping, jsonl_writer
+
 parser = argparse.ArgumentParser(
                     prog='ping_script.py',
                     formatter_class=argparse.RawDescriptionHelpFormatter,
                     description=('''\
 
-Description: Runs ping.
+Description: Runs ping, parsing each reply as it arrives (with its UNIX time).
 
-Example: python3 ping_script.py <destination> -c <count>
+Example: python3 ping_script.py <destination> -c <count> [-r <records.jsonl>]
 '''),
                     add_help=True)
 
 parser.add_argument('destination')
 parser.add_argument('-c', '--count', metavar='<count>', help='stop after <count> replies', dest='count', required=True)
+parser.add_argument('-r', '--records', metavar='<file>', help='also append each response to a JSON Lines file as it arrives', dest='records')
 args = parser.parse_args()
 
-ping_command = ['ping', '-c', str(args.count), args.destination]
-
-try: 
-    result = subprocess.run(ping_command, capture_output=True, text=True, check=True)
+ping_command = ['ping', '-D', '-O', '-c', str(args.count), args.destination]
 
-    pingjson = jc.parse('ping', result.stdout)
+if args.records:
+    with open(args.records, "a") as records_file:
+        pingjson = collect_ping(ping_command, args.destination, on_record=jsonl_writer(records_file))
+else:
+    pingjson = collect_ping(ping_command, args.destination)
 
+if pingjson is not None:
     timestr = time.strftime("%Y%m%d-%H%M%S")
     
     with open(f"ping-{timestr}.json", "w") as outfile:
          json.dump(pingjson, outfile)
-
-except subprocess.CalledProcessError as e:
-    print(f"Ping command failed with return code {e.returncode}: {e.stderr}")
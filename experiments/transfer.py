@@ -0,0 +1,393 @@
+#!/usr/bin/python3
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tarfile
+import time
+
+MANIFEST_FILE = "MANIFEST.sha256"
+STAGING_DIR = ".transfer"
+
+# Uncompressed size of the files packed in a batch
+DEFAULT_BATCH_SIZE = 64 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 1024
+
+class TransferError(Exception):
+    pass
+
+def sha256_file(path):
+    """
+    Parameters:
+        path (str): File path.
+
+    Returns:
+        str: SHA-256 hex digest of the file.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_manifest(text):
+    """
+    Parses a manifest in sha256sum format ("<sha256>  <file name>" lines).
+
+    Returns:
+        dict: SHA-256 of each file name.
+    """
+
+    manifest = {}
+    for line in text.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) == 2:
+            manifest[parts[1].lstrip("*")] = parts[0]
+    return manifest
+
+def manifest_lines(members):
+    """
+    Parameters:
+        members (dict): SHA-256 of each file name.
+
+    Returns:
+        str: Manifest lines in sha256sum format.
+    """
+
+    return "".join(f"{sha256}  {member}\n" for member, sha256 in members.items())
+
+class LocalDestination:
+    """
+    Destination directory on the local file system (or a mounted share).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __str__(self):
+        return self.directory
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read_manifest(self):
+        if not os.path.exists(self.path(MANIFEST_FILE)):
+            return {}
+        with open(self.path(MANIFEST_FILE), "r") as file:
+            return parse_manifest(file.read())
+
+    def part_size(self, name):
+        part = self.path(f".{name}.part")
+        return os.path.getsize(part) if os.path.exists(part) else 0
+
+    def append_part(self, name, source, offset):
+        with open(source, "rb") as infile, open(self.path(f".{name}.part"), "ab") as outfile:
+            infile.seek(offset)
+            for chunk in iter(lambda: infile.read(CHUNK_SIZE), b""):
+                outfile.write(chunk)
+
+    def commit(self, name, sha256, members):
+        part = self.path(f".{name}.part")
+        if sha256_file(part) != sha256:
+            os.remove(part)
+            raise TransferError(f"checksum mismatch of {name}, the partial upload was discarded")
+
+        with tarfile.open(part, "r:gz") as archive:
+            selected = [archive.getmember(member) for member in members]
+            # Only regular files directly in the destination, so a damaged or hostile batch cannot
+            # write elsewhere (links, devices, absolute paths or "..")
+            unsafe = [
+                info.name for info in selected
+                if not info.isfile() or os.path.basename(info.name) != info.name or info.name in ("", ".", "..")
+            ]
+            if unsafe:
+                os.remove(part)
+                raise TransferError(f"unsafe members in {name} ({', '.join(unsafe)}), the batch was discarded")
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(self.directory, members=selected, filter="data")
+            else:
+                archive.extractall(self.directory, members=selected)
+        corrupted = [member for member, member_sha256 in members.items() if sha256_file(self.path(member)) != member_sha256]
+        if corrupted:
+            raise TransferError(f"checksum mismatch of {', '.join(corrupted)} after unpacking {name}")
+
+        with open(self.path(MANIFEST_FILE), "a") as file:
+            file.write(manifest_lines(members))
+            file.flush()
+            os.fsync(file.fileno())
+        os.remove(part)
+
+    def remove_part(self, name):
+        os.remove(self.path(f".{name}.part"))
+
+class SshDestination:
+    """
+    Destination directory on a remote host ("user@host:/path"), reached through ssh.
+
+    The remote host only needs a POSIX shell, cat, wc, tar and sha256sum.
+    """
+
+    def __init__(self, target, ssh_command="ssh -o BatchMode=yes"):
+        self.host, self.directory = target.split(":", 1)
+        self.ssh_command = shlex.split(ssh_command)
+        self.run(f"mkdir -p {self.path('')}")
+
+    def __str__(self):
+        return f"{self.host}:{self.directory}"
+
+    def path(self, name):
+        return shlex.quote(os.path.join(self.directory, name))
+
+    def run(self, script, stdin=None):
+        """
+        Runs a shell script on the remote host.
+
+        Returns:
+            str: Standard output of the script.
+        """
+
+        result = subprocess.run(self.ssh_command + [self.host, script], stdin=stdin, capture_output=True)
+        if result.returncode != 0:
+            raise TransferError(f"ssh command failed with return code {result.returncode}: {result.stderr.decode().strip()}")
+        return result.stdout.decode()
+
+    def read_manifest(self):
+        return parse_manifest(self.run(f"cat {self.path(MANIFEST_FILE)} 2>/dev/null || true"))
+
+    def part_size(self, name):
+        part = self.path(f".{name}.part")
+        return int(self.run(f"if [ -f {part} ]; then wc -c < {part}; else echo 0; fi").strip())
+
+    def append_part(self, name, source, offset):
+        with open(source, "rb") as file:
+            file.seek(offset)
+            self.run(f"cat >> {self.path(f'.{name}.part')}", stdin=file)
+
+    def commit(self, name, sha256, members):
+        # A single round trip: verify the batch, unpack it, verify the members and update the manifest
+        part = self.path(f".{name}.part")
+        lines = shlex.quote(manifest_lines(members))
+        self.run(
+            f"cd {self.path('')} || exit 1\n"
+            f"if [ \"$(sha256sum < {part} | cut -d ' ' -f 1)\" != {sha256} ]; then\n"
+            f"    rm -f {part}; echo 'checksum mismatch of {name}, the partial upload was discarded' >&2; exit 3\n"
+            f"fi\n"
+            f"tar -xzf {part} {' '.join(shlex.quote(member) for member in members)} || exit 4\n"
+            f"printf %s {lines} | sha256sum -c --quiet - >&2 || exit 5\n"
+            f"printf %s {lines} >> {self.path(MANIFEST_FILE)} && rm -f {part}"
+        )
+
+    def remove_part(self, name):
+        self.run(f"rm -f {self.path(f'.{name}.part')}")
+
+def open_destination(destination, ssh_command="ssh -o BatchMode=yes"):
+    """
+    Parameters:
+        destination (str): Local directory, or remote directory as "user@host:/path".
+        ssh_command (str): ssh command used for remote destinations.
+
+    Returns:
+        LocalDestination or SshDestination: Destination.
+    """
+
+    host = destination.split(":", 1)[0]
+    if ":" in destination and "/" not in host and not os.path.exists(host):
+        return SshDestination(destination, ssh_command)
+    return LocalDestination(destination)
+
+def stage_batches(source_dir, pattern, delivered, batch_size):
+    """
+    Packs the files waiting for transfer into compressed batches (tar.gz) in the staging directory.
+
+    Each batch has a sidecar JSON file with the SHA-256 of the batch and of each member. Files
+    already staged in a previous (interrupted) transfer are not packed again, so that their
+    batch can be resumed.
+
+    Parameters:
+        source_dir (str): Directory of the collected files.
+        pattern (str): Glob pattern of the files to transfer.
+        delivered (dict): Destination manifest (SHA-256 of each delivered file).
+        batch_size (int): Maximum uncompressed size (in bytes) of a batch.
+
+    Returns:
+        list: Sidecar paths of the staged batches.
+    """
+
+    staging_dir = os.path.join(source_dir, STAGING_DIR)
+    os.makedirs(staging_dir, exist_ok=True)
+
+    staged = set()
+    for sidecar in glob.glob(os.path.join(staging_dir, "*.json")):
+        with open(sidecar, "r") as file:
+            staged.update(json.load(file)["members"])
+
+    pending = []
+    for path in sorted(glob.glob(os.path.join(source_dir, pattern))):
+        name = os.path.basename(path)
+        if name in staged:
+            continue
+        if name in delivered and delivered[name] != sha256_file(path):
+            print(f"Skipping {name}: a different file with the same name exists at the destination.")
+            continue
+        pending.append(name)
+
+    batches = []
+    current, current_size = [], 0
+    for name in pending:
+        size = os.path.getsize(os.path.join(source_dir, name))
+        if current and current_size + size > batch_size:
+            batches.append(current)
+            current, current_size = [], 0
+        current.append(name)
+        current_size += size
+    if current:
+        batches.append(current)
+
+    for members in batches:
+        hashes = {name: sha256_file(os.path.join(source_dir, name)) for name in members}
+        batch_name = f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{hashlib.sha256(json.dumps(hashes, sort_keys=True).encode()).hexdigest()[:12]}.tar.gz"
+        batch_path = os.path.join(staging_dir, batch_name)
+
+        # Already delivered files are only recorded, to be verified and deleted with the batch
+        to_send = [name for name in members if delivered.get(name) != hashes[name]]
+        with tarfile.open(batch_path + ".tmp", "w:gz") as archive:
+            for name in to_send:
+                archive.add(os.path.join(source_dir, name), arcname=name)
+        os.replace(batch_path + ".tmp", batch_path)
+
+        sidecar = batch_path[:-len(".tar.gz")] + ".json"
+        with open(sidecar + ".tmp", "w") as file:
+            json.dump({"batch": batch_name, "sha256": sha256_file(batch_path), "members": hashes, "send": to_send}, file)
+        os.replace(sidecar + ".tmp", sidecar)
+
+    return sorted(glob.glob(os.path.join(staging_dir, "*.json")))
+
+def send_batch(destination, source_dir, sidecar, delivered, keep=False):
+    """
+    Uploads a staged batch (resuming a partial upload), verifies it and deletes the local files.
+
+    Parameters:
+        destination (LocalDestination or SshDestination): Destination.
+        source_dir (str): Directory of the collected files.
+        sidecar (str): Sidecar JSON file of the batch.
+        delivered (dict): Destination manifest, updated with the delivered files.
+        keep (bool): Keep the local files after the transfer.
+
+    Returns:
+        int: Number of bytes uploaded.
+    """
+
+    with open(sidecar, "r") as file:
+        batch = json.load(file)
+    batch_path = os.path.join(os.path.dirname(sidecar), batch["batch"])
+    name, members = batch["batch"], batch["members"]
+
+    to_send = [member for member in batch["send"] if delivered.get(member) != members[member]]
+    uploaded = 0
+
+    if to_send:
+        batch_size = os.path.getsize(batch_path)
+        offset = destination.part_size(name)
+        if offset > batch_size:
+            destination.remove_part(name)
+            offset = 0
+        if offset < batch_size:
+            destination.append_part(name, batch_path, offset)
+            uploaded = batch_size - offset
+
+        destination.commit(name, batch["sha256"], {member: members[member] for member in to_send})
+        delivered.update({member: members[member] for member in to_send})
+
+    # Local files are deleted only once the destination holds a verified copy
+    if not keep:
+        for member, sha256 in members.items():
+            path = os.path.join(source_dir, member)
+            if delivered.get(member) == sha256 and os.path.exists(path) and sha256_file(path) == sha256:
+                os.remove(path)
+    os.remove(batch_path)
+    os.remove(sidecar)
+
+    return uploaded
+
+def transfer_logs(destination, source_dir=".", pattern="*.json", batch_size=DEFAULT_BATCH_SIZE, keep=False, ssh_command="ssh -o BatchMode=yes"):
+    """
+    Transfers the collected files in compressed, checksummed batches.
+
+    Files already in the destination manifest (same name and SHA-256) are not sent again,
+    interrupted uploads are resumed, and the local files are deleted only after their
+    checksum is verified at the destination. Failed batches stay staged for the next run.
+
+    Parameters:
+        destination (str): Local directory, or remote directory as "user@host:/path".
+        source_dir (str): Directory of the collected files.
+        pattern (str): Glob pattern of the files to transfer.
+        batch_size (int): Maximum uncompressed size (in bytes) of a batch.
+        keep (bool): Keep the local files after the transfer.
+        ssh_command (str): ssh command used for remote destinations.
+
+    Returns:
+        bool: True if every batch was delivered.
+    """
+
+    try:
+        target = open_destination(destination, ssh_command)
+        delivered = target.read_manifest()
+    except (TransferError, OSError) as e:
+        print(f"File transfer failed: {e}")
+        return False
+
+    sidecars = stage_batches(source_dir, pattern, delivered, batch_size)
+    if not sidecars:
+        print("No files found for transfer.")
+        return True
+
+    success = True
+    for sidecar in sidecars:
+        try:
+            uploaded = send_batch(target, source_dir, sidecar, delivered, keep)
+            print(f"Batch {os.path.basename(sidecar)} delivered to {target} ({uploaded} bytes uploaded).")
+        except (TransferError, OSError, tarfile.TarError) as e:
+            print(f"File transfer of batch {os.path.basename(sidecar)} failed (it will be resumed on the next run): {e}")
+            success = False
+
+    return success
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+                        prog='transfer.py',
+                        formatter_class=argparse.RawDescriptionHelpFormatter,
+                        description=('''\
+
+    Description: Transfers the collected JSON files in compressed batches, skipping the files already
+                 at the destination, resuming interrupted uploads and deleting the local files only
+                 after their checksum is verified at the destination.
+
+    Example: python3 transfer.py morse@10.11.23.204:/home/morse/logs
+             python3 transfer.py /mnt/logs -d /tmp/captures
+    '''),
+                        add_help=True)
+
+    parser.add_argument('destination', help='local directory, or remote directory as user@host:/path')
+    parser.add_argument('-d', '--source-dir', metavar='dir', help='directory of the collected files (default = current directory)', dest='source_dir', default='.')
+    parser.add_argument('-p', '--pattern', metavar='glob', help='files to transfer (default = *.json)', dest='pattern', default='*.json')
+    parser.add_argument('-b', '--batch-size', metavar='MB', type=float, help='maximum uncompressed size of a batch (default = 64 MB)', dest='batch_size', default=DEFAULT_BATCH_SIZE / 1024 / 1024)
+    parser.add_argument('-k', '--keep', action='store_true', help='keep the local files after the transfer', dest='keep')
+    parser.add_argument('--ssh-command', metavar='command', help='ssh command for remote destinations (default = "ssh -o BatchMode=yes")', dest='ssh_command', default='ssh -o BatchMode=yes')
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    success = transfer_logs(args.destination, args.source_dir, args.pattern, int(args.batch_size * 1024 * 1024), args.keep, args.ssh_command)
+
+    raise SystemExit(0 if success else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Timing spans, counters and optional profiling shared by the REPLICA tools.
+
+Each tool creates one Instrumentation object and wraps its stages in named spans:
+
+    instr = Instrumentation("get_data")
+
+    with instr.span("parse"):
+        ...
+    instr.count("rows", len(rows))
+
+Spans and counters are always collected (the overhead is a couple of clock reads
+per span). When profiling is enabled (--profile), the tool also runs under
+cProfile and tracemalloc, and finish() writes to the profile directory:
+
+- [tool]-[timestamp].json: machine-readable report (spans, counters, peak RSS,
+  top allocations).
+- [tool]-[timestamp].prof: cProfile dump (e.g., python -m pstats FILE, snakeviz FILE).
+"""
+
+import argparse
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+# Number of allocation sites included in the report
+TOP_ALLOCATIONS = 20
+
+DEFAULT_PROFILE_DIR = "profiles"
+
+
+class Instrumentation:
+    """
+    Named timing spans, counters and optional cProfile/tracemalloc profiling of a tool run.
+    """
+
+    def __init__(self, tool: str) -> None:
+        """
+        Args
+        ----
+            tool: Tool name (used in the report file names).
+        """
+
+        self.tool = tool
+        self.spans = {}
+        self.counters = {}
+        self.profile_dir = None
+
+        self._profiler = None
+        self._start_wall_time = time.perf_counter()
+        self._start_cpu_time = time.process_time()
+        self._started_at = datetime.datetime.now()
+
+    def enable_profiling(self, profile_dir: str) -> None:
+        """
+        Start cProfile and tracemalloc. The report is written by finish().
+
+        Args
+        ----
+            profile_dir: Output directory of the profiling report and dumps.
+        """
+
+        self.profile_dir = profile_dir
+        tracemalloc.start()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        """
+        Measure the time (and allocated memory, when profiling) of a block of code.
+
+        Spans with the same name are aggregated.
+
+        Args
+        ----
+            name: Span name (e.g., parse, extract, join, write, render, simulate).
+        """
+
+        tracing = tracemalloc.is_tracing()
+        start_memory = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            alloc_mb = (tracemalloc.get_traced_memory()[0] - start_memory) / 2**20 if tracing else 0.0
+            self.add_span(name, time.perf_counter() - start_time, alloc_mb)
+
+    def add_span(self, name: str, duration_s: float, alloc_mb: float = 0.0) -> None:
+        """
+        Add a span measured elsewhere (e.g., in a worker process).
+
+        Args
+        ----
+            name: Span name.
+            duration_s: Duration of the span (s).
+            alloc_mb: Memory allocated during the span (MB).
+        """
+
+        span = self.spans.setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0, "alloc_mb": 0.0})
+        span["calls"] += 1
+        span["total_s"] += duration_s
+        span["max_s"] = max(span["max_s"], duration_s)
+        span["alloc_mb"] += alloc_mb
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Increment a counter (e.g., rows, bytes, files).
+
+        Args
+        ----
+            name: Counter name.
+            value: Increment.
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> dict:
+        """
+        Returns
+        -------
+            Report with the spans, counters and resource usage of the run.
+        """
+
+        report = {
+            "tool": self.tool,
+            "argv": sys.argv,
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "wall_time_s": time.perf_counter() - self._start_wall_time,
+            "cpu_time_s": time.process_time() - self._start_cpu_time,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KiB on Linux
+            "spans": self.spans,
+            "counters": self.counters,
+        }
+
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            report["tracemalloc"] = {
+                "peak_mb": tracemalloc.get_traced_memory()[1] / 2**20,
+                "top_allocations": [
+                    {"location": str(stat.traceback), "size_mb": stat.size / 2**20, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+                ],
+            }
+
+        return report
+
+    def finish(self) -> None:
+        """
+        Stop profiling and write the report and the cProfile dump (only when profiling).
+        """
+
+        if self._profiler is None:
+            return
+
+        self._profiler.disable()
+        report = self.report()
+        tracemalloc.stop()
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base_name = os.path.join(self.profile_dir, f"{self.tool}-{self._started_at:%Y%m%d-%H%M%S}")
+
+        self._profiler.dump_stats(base_name + ".prof")
+        report["cprofile"] = base_name + ".prof"
+
+        with open(base_name + ".json", "w") as file:
+            json.dump(report, file, indent=2)
+
+        print(f"-- Profile of {self.tool} saved at: {base_name}.json")
+        for name, span in sorted(self.spans.items(), key=lambda item: -item[1]["total_s"]):
+            print(f"   {name:<12} {span['total_s']:>9.3f} s  ({span['calls']} calls)")
+
+
+def add_profile_argument(parser: argparse.ArgumentParser, optional_dir: bool = True) -> None:
+    """
+    Add the --profile argument to a tool argument parser.
+
+    Args
+    ----
+        parser: Argument parser.
+        optional_dir: Whether DIR can be omitted. Tools with variable positional arguments
+            require it, as an optional DIR would take their first positional argument.
+    """
+
+    if optional_dir:
+        parser.add_argument(
+            "--profile",
+            nargs="?",
+            const=DEFAULT_PROFILE_DIR,
+            metavar="DIR",
+            help=f"Profile the run with cProfile and tracemalloc, and write a JSON report to DIR (default: {DEFAULT_PROFILE_DIR}/)",
+        )
+    else:
+        parser.add_argument(
+            "--profile",
+            metavar="DIR",
+            help="Profile the run with cProfile and tracemalloc, and write a JSON report to DIR",
+        )
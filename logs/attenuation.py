@@ -0,0 +1,306 @@
+"""
+Generate attenuated variants of trace-based datasets from a declarative attenuation profile.
+
+An attenuation profile is a JSON file mapping a variant name (used as the
+output file suffix, e.g. "offset") to an attenuation specification:
+
+    {
+        "offset": {"type": "constant", "attenuation_db": 26},
+        "far": {"type": "friis", "reference_distance_m": 30, "target_distance_m": 183.5},
+        "fade": {
+            "type": "schedule",
+            "time_s": [0, 270, 540],
+            "attenuation_db": [20, 35, 20],
+            "interpolation": "linear"
+        }
+    }
+
+Supported types:
+
+- constant: fixed attenuation in dB.
+- friis: free-space loss delta between the reference and target distances,
+  i.e., 20 * log10(target / reference).
+- schedule: time-varying attenuation, interpolated ("linear") or held
+  ("step") between the given breakpoints.
+
+Any specification may contain a "scenario_overrides" mapping with per-scenario
+field overrides (e.g., {"udp-uplink": {"attenuation_db": 24}}).
+
+The attenuation is subtracted from "rx_power_dbm". The remaining columns,
+including the measured throughput, are kept unchanged.
+
+The checked-in trace-based-[scenario]-attenuated.csv datasets were not generated
+from a profile (their throughput also differs from the source traces), so the
+output directory must be given explicitly, and variants should not be named
+"attenuated" unless those datasets are meant to be replaced.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+PROFILE_TYPES = ("constant", "friis", "schedule")
+
+SCENARIOS = ["tcp-uplink", "tcp-downlink", "tcp-bidir", "udp-uplink", "udp-downlink", "udp-bidir"]
+
+
+#######################################
+# FUNCTIONS
+#######################################
+def load_attenuation_profile(profile_path: str) -> dict:
+    """
+    Load and validate an attenuation profile.
+
+    Args
+    ----
+        profile_path: Path of the JSON attenuation profile.
+
+    Returns
+    -------
+        Dictionary mapping each variant name to its attenuation specification.
+    """
+
+    with open(profile_path, "r") as file:
+        profile = json.load(file)
+
+    if not isinstance(profile, dict) or not profile:
+        raise ValueError(f"Attenuation profile {profile_path} must be a non-empty JSON object.")
+
+    for variant, spec in profile.items():
+        validate_attenuation_spec(variant, spec)
+        for scenario in spec.get("scenario_overrides", {}):
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario '{scenario}' in variant '{variant}'.")
+            validate_attenuation_spec(variant, resolve_attenuation_spec(spec, scenario))
+
+    return profile
+
+
+def validate_attenuation_spec(variant: str, spec: dict) -> None:
+    """
+    Check that an attenuation specification has all the fields required by its type.
+
+    Args
+    ----
+        variant: Variant name (for error messages).
+        spec: Attenuation specification.
+    """
+
+    profile_type = spec.get("type")
+
+    if profile_type not in PROFILE_TYPES:
+        raise ValueError(
+            f"Invalid attenuation type '{profile_type}' in variant '{variant}'. "
+            f"Accepted values are: {', '.join(PROFILE_TYPES)}."
+        )
+
+    if profile_type == "constant" and "attenuation_db" not in spec:
+        raise ValueError(f"Variant '{variant}' requires 'attenuation_db'.")
+
+    if profile_type == "friis":
+        for field in ("reference_distance_m", "target_distance_m"):
+            if spec.get(field, 0) <= 0:
+                raise ValueError(f"Variant '{variant}' requires a positive '{field}'.")
+
+    if profile_type == "schedule":
+        time_s = spec.get("time_s", [])
+        values_db = spec.get("attenuation_db", [])
+        if not time_s or len(time_s) != len(values_db):
+            raise ValueError(
+                f"Variant '{variant}' requires 'time_s' and 'attenuation_db' lists of equal length."
+            )
+        if np.any(np.diff(time_s) <= 0):
+            raise ValueError(f"Variant '{variant}' requires strictly increasing 'time_s'.")
+        if spec.get("interpolation", "linear") not in ("linear", "step"):
+            raise ValueError(f"Variant '{variant}' has an invalid 'interpolation' (linear or step).")
+
+
+def resolve_attenuation_spec(spec: dict, scenario: str) -> dict:
+    """
+    Apply the per-scenario overrides of an attenuation specification.
+
+    Args
+    ----
+        spec: Attenuation specification.
+        scenario: Scenario of the trace (e.g., udp-uplink).
+
+    Returns
+    -------
+        Attenuation specification for the given scenario.
+    """
+
+    resolved = {key: value for key, value in spec.items() if key != "scenario_overrides"}
+    resolved.update(spec.get("scenario_overrides", {}).get(scenario, {}))
+
+    return resolved
+
+
+def compute_attenuation_db(spec: dict, time_s: np.ndarray) -> np.ndarray:
+    """
+    Compute the attenuation for each trace sample.
+
+    Args
+    ----
+        spec: Attenuation specification (already resolved for the scenario).
+        time_s: Array with the time of each trace sample.
+
+    Returns
+    -------
+        Array with the attenuation (dB) of each trace sample.
+    """
+
+    time_s = np.asarray(time_s, dtype=float)
+
+    if spec["type"] == "constant":
+        return np.full(time_s.shape, float(spec["attenuation_db"]))
+
+    if spec["type"] == "friis":
+        delta_db = 20 * np.log10(spec["target_distance_m"] / spec["reference_distance_m"])
+        return np.full(time_s.shape, delta_db)
+
+    breakpoints_s = np.asarray(spec["time_s"], dtype=float)
+    values_db = np.asarray(spec["attenuation_db"], dtype=float)
+
+    if spec.get("interpolation", "linear") == "step":
+        indexes = np.searchsorted(breakpoints_s, time_s, side="right") - 1
+        return values_db[np.clip(indexes, 0, len(values_db) - 1)]
+
+    return np.interp(time_s, breakpoints_s, values_db)
+
+
+def apply_attenuation(trace_df: pd.DataFrame, spec: dict, scenario: str) -> pd.DataFrame:
+    """
+    Attenuate the received power of a whole trace-based dataset.
+
+    Args
+    ----
+        trace_df: Trace-based dataset (time_s, tx_node, rx_node, rx_power_dbm, throughput_kbps).
+        spec: Attenuation specification.
+        scenario: Scenario of the trace (e.g., udp-uplink).
+
+    Returns
+    -------
+        New trace-based dataset with the attenuated received power.
+    """
+
+    resolved_spec = resolve_attenuation_spec(spec, scenario)
+    attenuation_db = compute_attenuation_db(resolved_spec, trace_df["time_s"].to_numpy())
+
+    attenuated_df = trace_df.copy()
+    attenuated_df["rx_power_dbm"] = (trace_df["rx_power_dbm"].to_numpy() - attenuation_db).round(2)
+
+    return attenuated_df
+
+
+def generate_attenuated_variants(
+    trace_df: pd.DataFrame,
+    profile: dict,
+    scenario: str,
+    output_dir: str,
+) -> list:
+    """
+    Write one attenuated dataset per profile variant.
+
+    Args
+    ----
+        trace_df: Trace-based dataset.
+        profile: Attenuation profile (variant name -> specification).
+        scenario: Scenario of the trace (e.g., udp-uplink).
+        output_dir: Directory of the output CSV files.
+
+    Returns
+    -------
+        List of the generated files.
+    """
+
+    output_files = []
+
+    for variant, spec in profile.items():
+        output_file = os.path.join(output_dir, f"trace-based-{scenario}-{variant}.csv")
+        apply_attenuation(trace_df, spec, scenario).to_csv(output_file, index=False)
+        output_files.append(output_file)
+
+    return output_files
+
+
+def generate_all_variants(datasets_dir: str, profile: dict, scenarios: list, output_dir: str) -> list:
+    """
+    Generate the attenuated variants of every trace-based dataset in a directory.
+
+    Args
+    ----
+        datasets_dir: Directory with the trace-based-[scenario].csv files.
+        profile: Attenuation profile (variant name -> specification).
+        scenarios: Scenarios to process.
+        output_dir: Directory of the output CSV files.
+
+    Returns
+    -------
+        List of the generated files.
+    """
+
+    output_files = []
+
+    for scenario in scenarios:
+        trace_file = os.path.join(datasets_dir, f"trace-based-{scenario}.csv")
+        if not os.path.exists(trace_file):
+            print(f"Skipping {scenario}: {trace_file} not found.")
+            continue
+
+        trace_df = pd.read_csv(trace_file)
+        output_files += generate_attenuated_variants(trace_df, profile, scenario, output_dir)
+
+    return output_files
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(
+        description="Generate attenuated variants of trace-based datasets."
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=os.path.join(script_dir, "..", "datasets", "attenuation-profile.json"),
+        help="JSON attenuation profile (by default, datasets/attenuation-profile.json)",
+    )
+
+    parser.add_argument(
+        "--datasets-dir",
+        type=str,
+        default=os.path.join(script_dir, "..", "datasets"),
+        help="Directory with the trace-based-[scenario].csv files (by default, datasets/)",
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        required=True,
+        help="Directory of the attenuated datasets (e.g., ../datasets; existing variant files are overwritten)",
+    )
+
+    parser.add_argument(
+        "--scenario",
+        type=str,
+        action="append",
+        choices=SCENARIOS,
+        help="Scenario to process (can be repeated; by default, all scenarios)",
+    )
+
+    args = parser.parse_args()
+
+    attenuation_profile = load_attenuation_profile(args.profile)
+    generated_files = generate_all_variants(
+        args.datasets_dir,
+        attenuation_profile,
+        args.scenario or SCENARIOS,
+        args.output_dir,
+    )
+
+    for generated_file in generated_files:
+        print(f"Attenuated trace-based CSV saved at: {generated_file}")
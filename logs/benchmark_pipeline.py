@@ -0,0 +1,344 @@
+"""
+End-to-end benchmark of the log processing pipeline (get_data.py and dataset_build_v2.py).
+
+For each scale (number of JSON files), a synthetic campaign is generated with
+synthetic_campaign.py and each pipeline stage is run as a separate process. The
+benchmark reports, per stage, the wall time, input files/s, output rows/s and
+the peak RSS of the stage process.
+
+Results are appended to a JSON Lines history file and compared with the median
+of the latest previous results of the same stage, scale and run length, to detect
+regressions.
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_campaign import SCENARIO_SUFFIXES, generate_campaign
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stream used for the bidirectional scenarios by the build stage
+BIDIR_STREAM_ID = 5
+
+# Number of previous results whose median wall time is the baseline of a comparison
+HISTORY_RUNS = 5
+
+# Wall time increase (s) below which a slowdown is not reported as a regression (timing noise)
+MIN_SLOWDOWN_S = 0.1
+
+
+#######################################
+# FUNCTIONS
+#######################################
+def run_stage(cmd: list) -> dict:
+    """
+    Run a pipeline stage in a child process and measure its resource usage.
+
+    Args
+    ----
+        cmd: Command of the stage.
+
+    Returns
+    -------
+        Dictionary with the wall time, CPU time and peak RSS of the stage.
+    """
+
+    start_time = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    # Read stderr before waiting (avoids blocking on a full pipe), then collect the child rusage
+    stderr = proc.stderr.read()
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall_time_s = time.perf_counter() - start_time
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"Stage {' '.join(cmd)} failed:\n{stderr}")
+
+    return {
+        "wall_time_s": wall_time_s,
+        "cpu_time_s": rusage.ru_utime + rusage.ru_stime,
+        "peak_rss_mb": rusage.ru_maxrss / 1024,  # ru_maxrss is in KiB on Linux
+    }
+
+
+def count_csv_rows(csv_files: list) -> int:
+    """
+    Count the data rows (excluding headers) of a list of CSV files.
+    """
+
+    n_rows = 0
+
+    for csv_file in csv_files:
+        with open(csv_file, "rb") as file:
+            n_rows += max(sum(1 for _ in file) - 1, 0)
+
+    return n_rows
+
+
+def benchmark_extract(logs_dir: str, n_files: int) -> dict:
+    """
+    Benchmark get_data.py on a campaign.
+    """
+
+    result = run_stage([sys.executable, os.path.join(SCRIPT_DIR, "get_data.py"), "--logs_dir", logs_dir])
+    n_rows = count_csv_rows(glob.glob(os.path.join(logs_dir + "_extracted_data", "*", "*.csv")))
+
+    return {**result, "files": n_files, "rows": n_rows}
+
+
+def benchmark_build(logs_dir: str) -> dict:
+    """
+    Benchmark dataset_build_v2.py on a campaign extracted by get_data.py (all scenarios).
+    """
+
+    totals = {"wall_time_s": 0.0, "cpu_time_s": 0.0, "peak_rss_mb": 0.0}
+    extracted_dir = logs_dir + "_extracted_data"
+    scenarios = [s for s in SCENARIO_SUFFIXES if os.path.exists(os.path.join(extracted_dir, s, "iperf3.csv"))]
+
+    for scenario in scenarios:
+        cmd = [
+            sys.executable,
+            os.path.join(SCRIPT_DIR, "dataset_build_v2.py"),
+            "--scenario",
+            scenario,
+            "--generate_trace_csv",
+            "--data_directory",
+            logs_dir,
+        ]
+        if "-bidir" in scenario:
+            cmd += ["--stream_id", str(BIDIR_STREAM_ID)]
+
+        result = run_stage(cmd)
+        totals["wall_time_s"] += result["wall_time_s"]
+        totals["cpu_time_s"] += result["cpu_time_s"]
+        totals["peak_rss_mb"] = max(totals["peak_rss_mb"], result["peak_rss_mb"])
+
+    input_files = [os.path.join(extracted_dir, s, f) for s in scenarios for f in ("iperf3.csv", "cell_info.csv")]
+    output_files = glob.glob(os.path.join(extracted_dir, "*", "propagation-loss-dataset.csv"))
+    output_files += glob.glob(os.path.join(extracted_dir, "*", "trace-based-*.csv"))
+
+    return {**totals, "files": len(input_files), "rows": count_csv_rows(output_files)}
+
+
+def compare_with_history(
+    result: dict,
+    history: list,
+    tolerance: float,
+    history_runs: int = HISTORY_RUNS,
+    min_slowdown_s: float = MIN_SLOWDOWN_S,
+) -> str:
+    """
+    Compare a result with the median of the latest previous results of the same stage, scale
+    and run length.
+
+    Args
+    ----
+        result: Benchmark result.
+        history: Previous benchmark results.
+        tolerance: Relative slowdown (e.g., 0.1 for 10%) above which a regression is reported.
+        history_runs: Number of previous results in the baseline.
+        min_slowdown_s: Wall time increase (s) below which no regression is reported.
+
+    Returns
+    -------
+        Comparison summary.
+    """
+
+    previous = [
+        entry
+        for entry in history
+        if entry["stage"] == result["stage"]
+        and entry["scale"] == result["scale"]
+        and entry.get("samples_per_run") == result["samples_per_run"]
+    ][-history_runs:]
+    if not previous:
+        return "no previous result"
+
+    baseline_s = statistics.median(entry["wall_time_s"] for entry in previous)
+    ratio = result["wall_time_s"] / baseline_s if baseline_s else 1.0
+    slowdown_s = result["wall_time_s"] - baseline_s
+    status = "REGRESSION" if ratio > 1 + tolerance and slowdown_s > min_slowdown_s else "ok"
+
+    return f"{status} ({ratio:.2f}x wall time vs. median of previous runs, n={len(previous)} since {previous[0]['timestamp']})"
+
+
+def git_commit() -> str:
+    """
+    Get the current git commit of the repository (or an empty string).
+    """
+
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=SCRIPT_DIR,
+        )
+        return proc.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return ""
+
+
+def run_benchmark(
+    scales: list,
+    n_samples: int,
+    results_file: str,
+    tolerance: float,
+    keep: bool,
+    history_runs: int = HISTORY_RUNS,
+    min_slowdown_s: float = MIN_SLOWDOWN_S,
+) -> bool:
+    """
+    Run the benchmark for all scales.
+
+    Args
+    ----
+        scales: List with the number of JSON files of each campaign.
+        n_samples: Number of samples (seconds) per run.
+        results_file: JSON Lines history file.
+        tolerance: Relative slowdown above which a regression is reported.
+        keep: Keep the generated campaigns.
+        history_runs: Number of previous results in the baseline of each comparison.
+        min_slowdown_s: Wall time increase (s) below which no regression is reported.
+
+    Returns
+    -------
+        True if a regression was detected.
+    """
+
+    history = []
+    if os.path.exists(results_file):
+        with open(results_file, "r") as file:
+            history = [json.loads(line) for line in file if line.strip()]
+
+    work_dir = tempfile.mkdtemp(prefix="replica-benchmark-")
+    commit = git_commit()
+    regression = False
+
+    print(f"{'stage':<8} {'scale':>7} {'wall (s)':>9} {'files/s':>9} {'rows/s':>11} {'RSS (MB)':>9}  comparison")
+
+    try:
+        for scale in scales:
+            logs_dir = os.path.join(work_dir, f"logs_synthetic_{scale}")
+            generate_campaign(logs_dir, scale, n_samples, start_time=1740142801, seed=scale)
+
+            for stage, benchmark in (
+                ("extract", lambda: benchmark_extract(logs_dir, scale)),
+                ("build", lambda: benchmark_build(logs_dir)),
+            ):
+                measurement = benchmark()
+                wall_time_s = max(measurement["wall_time_s"], 1e-9)
+                result = {
+                    "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "git_commit": commit,
+                    "stage": stage,
+                    "scale": scale,
+                    "samples_per_run": n_samples,
+                    **measurement,
+                    "files_per_s": measurement["files"] / wall_time_s,
+                    "rows_per_s": measurement["rows"] / wall_time_s,
+                }
+
+                comparison = compare_with_history(result, history, tolerance, history_runs, min_slowdown_s)
+                regression |= comparison.startswith("REGRESSION")
+
+                print(
+                    f"{stage:<8} {scale:>7} {result['wall_time_s']:>9.2f} {result['files_per_s']:>9.1f} "
+                    f"{result['rows_per_s']:>11.0f} {result['peak_rss_mb']:>9.1f}  {comparison}"
+                )
+
+                os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+                with open(results_file, "a") as file:
+                    file.write(json.dumps(result) + "\n")
+
+            if not keep:
+                shutil.rmtree(logs_dir)
+                shutil.rmtree(logs_dir + "_extracted_data", ignore_errors=True)
+
+    finally:
+        if not keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            print(f"Campaigns kept in {work_dir}")
+
+    return regression
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark get_data.py and dataset_build_v2.py on synthetic campaigns."
+    )
+
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[18, 180, 1800],
+        help="Number of JSON files of each synthetic campaign (default: 18 180 1800)",
+    )
+
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=540,
+        help="Number of samples (seconds) per run (default: 540)",
+    )
+
+    parser.add_argument(
+        "--results-file",
+        type=str,
+        default=os.path.join(os.path.dirname(SCRIPT_DIR), "simulations", "benchmark-pipeline.jsonl"),
+        help="JSON Lines file where results are appended (default: ../simulations/benchmark-pipeline.jsonl)",
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative wall time increase reported as a regression (default: 0.1)",
+    )
+
+    parser.add_argument(
+        "--history-runs",
+        type=int,
+        default=HISTORY_RUNS,
+        help=f"Number of previous results whose median is the baseline (default: {HISTORY_RUNS})",
+    )
+
+    parser.add_argument(
+        "--min-slowdown",
+        type=float,
+        default=MIN_SLOWDOWN_S,
+        help=f"Wall time increase (s) below which no regression is reported (default: {MIN_SLOWDOWN_S})",
+    )
+
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the generated campaigns",
+    )
+
+    args = parser.parse_args()
+
+    regression_detected = run_benchmark(
+        args.scales,
+        args.samples,
+        args.results_file,
+        args.tolerance,
+        args.keep,
+        args.history_runs,
+        args.min_slowdown,
+    )
+    sys.exit(1 if regression_detected else 0)
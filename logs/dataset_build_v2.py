@@ -3,6 +3,14 @@ import pandas as pd
 import random
 import numpy as np  # For log and power conversions
 import argparse
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instrumentation import Instrumentation, add_profile_argument
+
+from attenuation import generate_attenuated_variants, load_attenuation_profile
+from get_data import read_table
 
 # Set up the argument parser
 parser = argparse.ArgumentParser(description="Process a scenario and generate propagation loss dataset.")
@@ -37,9 +45,30 @@ parser.add_argument(
     help="Generate an additional CSV file for trace-based model (time_s, tx_node, rx_node, rx_power_dbm, throughput_kbps).",
 )
 
+# Add argument to generate attenuated variants of the trace-based CSV file
+parser.add_argument(
+    "--attenuation_profile",
+    type=str,
+    help="JSON attenuation profile (e.g., ../datasets/attenuation-profile.json). Generates one trace-based-[scenario]-[variant].csv file per profile variant. Requires --generate_trace_csv.",
+)
+
+# Add argument for the directory of the logs (the extracted data is read from [data_directory]_extracted_data)
+parser.add_argument(
+    "--data_directory",
+    type=str,
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs_22_02"),  # Change this to your target directory
+    help="Directory of the logs processed by get_data.py (default is logs_22_02, relative to the script location).",
+)
+
+add_profile_argument(parser)
+
 # Parse the arguments
 args = parser.parse_args()
 
+instr = Instrumentation("dataset_build_v2")
+if args.profile:
+    instr.enable_profiling(args.profile)
+
 # Use the scenario passed as a command line argument
 scenario = args.scenario
 
@@ -53,15 +82,22 @@ generate_trace_csv = args.generate_trace_csv
 if "-bidir" in scenario and args.stream_id is None:
     raise ValueError("For bidirectional scenarios, you must specify --stream_id.")
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-data_directory = os.path.join(script_dir, "logs_22_02")  # Change this to your target directory
+# Load the attenuation profile before processing, to fail early on invalid profiles
+if args.attenuation_profile and not generate_trace_csv:
+    raise ValueError("--attenuation_profile requires --generate_trace_csv.")
+
+attenuation_profile = load_attenuation_profile(args.attenuation_profile) if args.attenuation_profile else None
+
+data_directory = os.path.normpath(args.data_directory)
 
 iperf3_file = os.path.join(data_directory + f"_extracted_data/{scenario}/iperf3.csv")
 cellinfo_file = os.path.join(data_directory + f"_extracted_data/{scenario}/cell_info.csv")
 
 # Load the CSVs using pandas
-iperf3_df = pd.read_csv(iperf3_file)
-cellinfo_df = pd.read_csv(cellinfo_file)
+with instr.span("parse"):
+    iperf3_df = read_table(os.path.dirname(iperf3_file), "iperf3")
+    cellinfo_df = read_table(os.path.dirname(cellinfo_file), "cell_info")
+instr.count("input_rows", len(iperf3_df) + len(cellinfo_df))
 
 # Ensure required columns exist
 required_columns_iperf3 = {"stream_id", "bits_per_second"}
@@ -86,6 +122,8 @@ if "-bidir" in scenario:
 N = 273
 Tx_Power_db = 40  # Transmit power in dB
 
+derive_start_time = time.perf_counter()
+
 # Convert RSRP, SINR, and RSRQ from dB to linear
 cellinfo_df["RSRP_linear"] = 10 ** (cellinfo_df["ssRsrp"] / 10)
 cellinfo_df["SINR_linear"] = 10 ** (cellinfo_df["ssSinr"] / 10)
@@ -113,6 +151,8 @@ cellinfo_df["Rx_power_db"] = cellinfo_df["ssSinr"] + cellinfo_df["noise_dbm"]
 # Compute Loss (dB)
 cellinfo_df["loss_db"] = Tx_Power_db - cellinfo_df["Rx_power_db"]
 
+instr.add_span("derive", time.perf_counter() - derive_start_time)
+
 # Initialize lists to collect rows for both output files
 output_rows = []
 trace_based_rows = []
@@ -134,6 +174,7 @@ elif "-bidir" in scenario:
 max_rows_trace=540
 
 # Iterate through iperf3 rows and process data
+join_start_time = time.perf_counter()
 for index, iperf3_row in iperf3_df.iterrows():
 
 
@@ -187,6 +228,8 @@ for index, iperf3_row in iperf3_df.iterrows():
         if any(v is not None for v in trace_row.values()):
             trace_based_rows.append(trace_row)
 
+instr.add_span("join", time.perf_counter() - join_start_time)
+
 swapped_rows = [{"x_tx": row["x_rx"], "y_tx": row["y_rx"], "z_tx": row["z_rx"], "x_rx": row["x_tx"], "y_rx": row["y_tx"], "z_rx": row["z_tx"], "loss_db": row["loss_db"], "throughput_kbps": row["throughput_kbps"]} for row in output_rows]
 
 
@@ -200,12 +243,25 @@ output_dir = os.path.dirname(iperf3_file)  # Store in the same directory
 output_file = os.path.join(output_dir, "propagation-loss-dataset.csv")
 
 # Save the standard output DataFrame to CSV
-output_df.to_csv(output_file, index=False)
+with instr.span("write"):
+    output_df.to_csv(output_file, index=False)
+instr.count("rows", len(output_df))
 print(f"Processed position-based CSV saved at: {output_file}")
 
 # Create and save trace-based DataFrame if flag is set
 if generate_trace_csv and trace_based_rows:
     trace_df = pd.DataFrame(trace_based_rows + swapped_rows_trace)
     trace_output_file = os.path.join(output_dir, f"trace-based-{scenario}.csv")    
-    trace_df.to_csv(trace_output_file, index=False)
-    print(f"Processed trace-based CSV saved at: {trace_output_file}")
\ No newline at end of file
+    with instr.span("write"):
+        trace_df.to_csv(trace_output_file, index=False)
+    instr.count("rows", len(trace_df))
+    print(f"Processed trace-based CSV saved at: {trace_output_file}")
+
+    # Create and save the attenuated variants of the trace-based DataFrame
+    if attenuation_profile:
+        with instr.span("write"):
+            attenuated_files = generate_attenuated_variants(trace_df, attenuation_profile, scenario, output_dir)
+        for attenuated_file in attenuated_files:
+            print(f"Attenuated trace-based CSV saved at: {attenuated_file}")
+
+instr.finish()
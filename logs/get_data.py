@@ -1,10 +1,20 @@
+import argparse
 import os
 import json
 import csv
 import glob
-import re
+import io
+import math
+import shutil
+import sys
+from array import array
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instrumentation import Instrumentation, add_profile_argument
+
+instr = Instrumentation("get_data")
+
 # Define mapping of file patterns to scenarios
 SCENARIO_MAP = {
     r"-udp-bidir-": "udp-bidir",
@@ -20,118 +30,380 @@ def determine_scenario(filename):
             return scenario
     return "tcp-uplink"  # Default to TCP if no scenario is specified
 
+# Declared columns and types of the extracted tables. Each scenario folder has, per log type, a
+# table of per-file metadata ([type]_files.csv, one row per JSON file) and a table of samples
+# ([type].csv) that references its file by file_id (the row of the file in [type]_files.csv).
+# Types: "category" (strings), "int32" (never missing), "float32" and "float64" (empty when missing).
+SCHEMAS = {
+    "cell_info_files": [
+        ("file_id", "int32"),
+        ("file_name", "category"),
+        ("device_serial", "category"),
+        ("host_ip", "category"),
+        ("n_samples", "int32"),
+        ("mean_ssRsrp", "float64"),
+        ("mean_ssRsrq", "float64"),
+        ("mean_ssSinr", "float64"),
+        ("std_dev_ssRsrp", "float64"),
+        ("std_dev_ssRsrq", "float64"),
+        ("std_dev_ssSinr", "float64"),
+    ],
+    "cell_info": [
+        ("file_id", "int32"),
+        ("iteration", "int32"),
+        ("mBands", "float32"),
+        ("ssRsrp", "float32"),
+        ("ssRsrq", "float32"),
+        ("ssSinr", "float32"),
+        ("level", "float32"),
+    ],
+    "iperf3_files": [
+        ("file_id", "int32"),
+        ("file_name", "category"),
+        ("local_host", "category"),
+        ("remote_host", "category"),
+        ("protocol", "category"),
+        ("start_time", "float64"),
+        ("duration", "float64"),
+    ],
+    "iperf3": [
+        ("file_id", "int32"),
+        ("stream_id", "int32"),
+        ("bits_per_second", "float64"),
+        ("interval_start", "float64"),
+        ("interval_end", "float64"),
+    ],
+    "ping_files": [
+        ("file_id", "int32"),
+        ("file_name", "category"),
+        ("destination_ip", "category"),
+        ("packet_loss_percent", "float64"),
+        ("round_trip_ms_avg", "float64"),
+    ],
+    "ping": [
+        ("file_id", "int32"),
+        ("icmp_seq", "int32"),
+        ("timestamp", "float64"),
+        ("time_ms", "float32"),
+    ],
+}
+
+# array typecodes of the numeric types (strings are kept in lists)
+TYPECODES = {"int32": "i", "float32": "f", "float64": "d"}
+
+class Table:
+    """
+    Columns of an extracted table, stored as typed arrays.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.schema = SCHEMAS[name]
+        self.columns = {column: array(TYPECODES[dtype]) if dtype in TYPECODES else [] for column, dtype in self.schema}
+
+    def __len__(self):
+        return len(self.columns[self.schema[0][0]])
+
+    def append(self, **values):
+        # Convert every value first, so a malformed row leaves the table unchanged
+        row = [(column, convert_value(values.get(column), dtype, column)) for column, dtype in self.schema]
+        for column, value in row:
+            self.columns[column].append(value)
+
+    def extend(self, other, file_id_offset=0):
+        for column, _ in self.schema:
+            if column == "file_id" and file_id_offset:
+                self.columns[column].extend(file_id + file_id_offset for file_id in other.columns[column])
+            else:
+                self.columns[column].extend(other.columns[column])
+
+    def write_csv(self, output_file):
+        formatters = [(self.columns[column], dtype) for column, dtype in self.schema]
+        with open(output_file, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([column for column, _ in self.schema])
+            for i in range(len(self)):
+                writer.writerow([format_value(values[i], dtype) for values, dtype in formatters])
+
+def convert_value(value, dtype, column):
+    if dtype == "category":
+        return "" if value is None else str(value)
+    if value is None or value == "":
+        if dtype == "int32":
+            raise ValueError(f"missing {column}")
+        return math.nan
+    return int(value) if dtype == "int32" else float(value)
+
+def format_value(value, dtype):
+    if dtype == "category" or dtype == "int32":
+        return value
+    if math.isnan(value):
+        return ""
+    # float32 values are written with the precision they are stored with
+    text = f"{value:.7g}" if dtype == "float32" else repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+def read_table(scenario_dir, name, columns=None, byte_ranges=None):
+    """
+    Loads an extracted table with its declared types.
+
+    Sample tables also get a categorical file_name column (from the per-file table).
+
+    Parameters:
+        scenario_dir (str): Scenario folder (e.g., logs_22_02_extracted_data/tcp-uplink).
+        name (str): Table (e.g., iperf3 or iperf3_files).
+        columns (list): Columns to load (by default, all of them).
+        byte_ranges (list): (offset, length) ranges of the rows to load (by default, all rows);
+            e.g., the rows of some files, from the log index (see log_index.py).
+
+    Returns:
+        DataFrame: Table.
+    """
+    import pandas as pd
+
+    schema = dict(SCHEMAS[name])
+    columns = list(columns or schema)
+    is_sample_table = f"{name}_files" in SCHEMAS
+    usecols = [column for column in columns if column != "file_name" or not is_sample_table]
+    if is_sample_table and "file_name" in columns and "file_id" not in usecols:
+        usecols.append("file_id")
+
+    table_file = os.path.join(scenario_dir, f"{name}.csv")
+    if byte_ranges is not None:
+        # Header and selected rows only, so the rest of the file is never read
+        with open(table_file, "rb") as file:
+            chunks = [file.readline()]
+            for offset, length in byte_ranges:
+                file.seek(offset)
+                chunks.append(file.read(length))
+        table_file = io.BytesIO(b"".join(chunks))
+
+    df = pd.read_csv(
+        table_file,
+        usecols=usecols,
+        dtype={column: schema[column] for column in usecols},
+    )
+
+    if is_sample_table and "file_name" in columns:
+        files_df = pd.read_csv(os.path.join(scenario_dir, f"{name}_files.csv"), usecols=["file_name"], dtype=str)
+        df["file_name"] = pd.Categorical.from_codes(df["file_id"].to_numpy(), categories=files_df["file_name"])
+
+    return df[columns]
+
 def extract_cell_info(file_path):
-    with open(file_path, 'r') as file:
+    with instr.span("parse"), open(file_path, 'r') as file:
         data = json.load(file)
     
     general_info = data.get("general_info", {})
     samples = data.get("samples", [])
     statistics = data.get("statistics", {})
     
-    extracted_data = []
+    samples_table = Table("cell_info")
     for sample in samples:
-        row = {
-            "file_name": os.path.basename(file_path),
-            "device_serial": general_info.get("device_serial", ""),
-            "host_ip": general_info.get("host_ip", ""),
-            "iteration": sample.get("iteration", ""),
-            "mBands": sample.get("mBands", ""),
-            "ssRsrp": sample.get("ssRsrp", ""),
-            "ssRsrq": sample.get("ssRsrq", ""),
-            "ssSinr": sample.get("ssSinr", ""),
-            "level": sample.get("level", ""),
-            "mean_ssRsrp": statistics.get("mean", {}).get("ssRsrp", ""),
-            "mean_ssRsrq": statistics.get("mean", {}).get("ssRsrq", ""),
-            "mean_ssSinr": statistics.get("mean", {}).get("ssSinr", ""),
-            "std_dev_ssRsrp": statistics.get("std_dev", {}).get("ssRsrp", ""),
-            "std_dev_ssSinr": statistics.get("std_dev", {}).get("ssSinr", ""),
-        }
-        extracted_data.append(row)
-    return extracted_data
+        # Run-length encoded records ("count" identical consecutive samples) are expanded
+        iteration = sample.get("iteration")
+        for offset in range(sample.get("count", 1)):
+            samples_table.append(
+                file_id=0,
+                iteration=iteration + offset if offset else iteration,
+                mBands=sample.get("mBands"),
+                ssRsrp=sample.get("ssRsrp"),
+                ssRsrq=sample.get("ssRsrq"),
+                ssSinr=sample.get("ssSinr"),
+                level=sample.get("level"),
+            )
+
+    files_table = Table("cell_info_files")
+    files_table.append(
+        file_id=0,
+        file_name=os.path.basename(file_path),
+        device_serial=general_info.get("device_serial"),
+        host_ip=general_info.get("host_ip"),
+        n_samples=len(samples_table),
+        mean_ssRsrp=statistics.get("mean", {}).get("ssRsrp"),
+        mean_ssRsrq=statistics.get("mean", {}).get("ssRsrq"),
+        mean_ssSinr=statistics.get("mean", {}).get("ssSinr"),
+        std_dev_ssRsrp=statistics.get("std_dev", {}).get("ssRsrp"),
+        std_dev_ssRsrq=statistics.get("std_dev", {}).get("ssRsrq"),
+        std_dev_ssSinr=statistics.get("std_dev", {}).get("ssSinr"),
+    )
+    return files_table, samples_table
 
 def extract_iperf3(file_path):
-    with open(file_path, "r") as file:
+    with instr.span("parse"), open(file_path, "r") as file:
         data = json.load(file)
     
     start_info = data.get("start", {})
     intervals = data.get("intervals", [])
-    extracted_data = []
     
+    samples_table = Table("iperf3")
     for interval in intervals:
-        streams = interval.get("streams", [])
-        sum_data = interval.get("sum", {})
-        
-        for stream in streams:
-            row = {
-                "file_name": os.path.basename(file_path),
-                "local_host": start_info.get("connected", [{}])[0].get("local_host", ""),
-                "remote_host": start_info.get("connected", [{}])[0].get("remote_host", ""),
-                "protocol": start_info.get("test_start", {}).get("protocol", ""),
-                "stream_id": stream.get("socket", ""),  # Unique identifier for each stream
-                "bits_per_second": stream.get("bits_per_second", ""),
-                "interval_start": stream.get("start", ""),
-                "interval_end": stream.get("end", ""),
-            }
-            extracted_data.append(row)
-    
-    return extracted_data
+        for stream in interval.get("streams", []):
+            samples_table.append(
+                file_id=0,
+                stream_id=stream.get("socket"),  # Unique identifier for each stream
+                bits_per_second=stream.get("bits_per_second"),
+                interval_start=stream.get("start"),
+                interval_end=stream.get("end"),
+            )
+
+    connected = start_info.get("connected") or [{}]
+    files_table = Table("iperf3_files")
+    files_table.append(
+        file_id=0,
+        file_name=os.path.basename(file_path),
+        local_host=connected[0].get("local_host"),
+        remote_host=connected[0].get("remote_host"),
+        protocol=start_info.get("test_start", {}).get("protocol"),
+        start_time=start_info.get("timestamp", {}).get("timesecs"),
+        duration=start_info.get("test_start", {}).get("duration"),
+    )
+    return files_table, samples_table
 
 def extract_ping(file_path):
-    with open(file_path, "r") as file:
+    with instr.span("parse"), open(file_path, "r") as file:
         data = json.load(file)
-    extracted_data = []
+
+    samples_table = Table("ping")
     for response in data.get("responses", []):
-        row = {
-            "file_name": os.path.basename(file_path),
-            "destination_ip": data.get("destination_ip", ""),
-            "icmp_seq": response.get("icmp_seq", ""),
-            "time_ms": response.get("time_ms", ""),
-        }
-        extracted_data.append(row)
-    return extracted_data
-
-def write_to_csv(data, output_file):
-    if not data:
-        return
-    fieldnames = list(data[0].keys())
-    non_empty_fieldnames = [field for field in fieldnames if any(row.get(field) for row in data)]
-    with open(output_file, "w", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=non_empty_fieldnames)
-        writer.writeheader()
-        for row in data:
-            writer.writerow({field: row.get(field, "") for field in non_empty_fieldnames})
+        samples_table.append(
+            file_id=0,
+            icmp_seq=response.get("icmp_seq"),
+            timestamp=response.get("timestamp"),
+            time_ms=response.get("time_ms"),
+        )
 
-def main():
+    files_table = Table("ping_files")
+    files_table.append(
+        file_id=0,
+        file_name=os.path.basename(file_path),
+        destination_ip=data.get("destination_ip"),
+        packet_loss_percent=data.get("packet_loss_percent"),
+        round_trip_ms_avg=data.get("round_trip_ms_avg"),
+    )
+    return files_table, samples_table
+
+def parse_args():
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    logs_directory = os.path.join(script_dir, "logs_22_02")  # Change this to your target directory
+
+    parser = argparse.ArgumentParser(description="Extract cell info, iperf3 and ping logs into per-scenario CSV files.")
+    parser.add_argument(
+        "--logs_dir",
+        type=str,
+        default=os.path.join(script_dir, "logs_22_02"),  # Change this to your target directory
+        help="Directory with the JSON log files (default is logs_22_02, relative to the script location).",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        help="Directory of the extracted data (default is [logs_dir]_extracted_data; required with --start, --end and --hours).",
+    )
+    parser.add_argument(
+        "--start",
+        type=str,
+        help="Only extract the runs that end after this time (e.g., 2025-03-06T12:00, local time of the file names).",
+    )
+    parser.add_argument(
+        "--end",
+        type=str,
+        help="Only extract the runs that start before this time (e.g., 2025-03-06T18:00).",
+    )
+    parser.add_argument(
+        "--hours",
+        type=str,
+        help="Only extract the runs that start in these hours of the day (e.g., 8-20 for daytime, 20-8 for night-time).",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        help="Log index used to find the runs of --start, --end and --hours (default is logs-index.sqlite, see log_index.py).",
+    )
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    # The default folder holds the full campaign, read by dataset_build_v2.py and log_index.py
+    if (args.start or args.end or args.hours) and not args.output_dir:
+        parser.error("--start, --end and --hours require --output_dir")
+
+    return args
+
+def main():
+    args = parse_args()
+    if args.profile:
+        instr.enable_profiling(args.profile)
+
+    logs_directory = os.path.normpath(args.logs_dir)
     json_files = glob.glob(os.path.join(logs_directory, "*.json"))
+
+    if args.start or args.end or args.hours:
+        # Imported here, as log_index.py imports this module
+        from log_index import INDEX_FILE, LogIndex, parse_hours, parse_time
+
+        # Only the files of the runs in the window are opened
+        with instr.span("index"):
+            index = LogIndex(args.index or INDEX_FILE)
+            index.update_campaign(logs_directory)
+            window_files = {
+                entry["file_name"]
+                for entry in index.query(
+                    campaigns=[os.path.basename(logs_directory)],
+                    start=parse_time(args.start) if args.start else None,
+                    end=parse_time(args.end) if args.end else None,
+                    hours=parse_hours(args.hours) if args.hours else None,
+                )
+            }
+            index.close()
+        json_files = [file_path for file_path in json_files if os.path.basename(file_path) in window_files]
     
-    extracted_data_folder = logs_directory + "_extracted_data"
+    extracted_data_folder = args.output_dir or logs_directory + "_extracted_data"
     os.makedirs(extracted_data_folder, exist_ok=True)
+
+    if args.start or args.end or args.hours:
+        # Remove the scenarios of a previous window, also those without runs in this one
+        for scenario in set(SCENARIO_MAP.values()) | {determine_scenario("")}:
+            shutil.rmtree(os.path.join(extracted_data_folder, scenario), ignore_errors=True)
     
-    categorized_data = defaultdict(lambda: defaultdict(list))
+    extractors = {"cell_info": extract_cell_info, "iperf3": extract_iperf3, "ping": extract_ping}
+    # categorized_data[scenario][file_type] = (files table, samples table)
+    categorized_data = defaultdict(dict)
     
-    for file_path in json_files:
-        scenario = determine_scenario(os.path.basename(file_path))
+    # Sorted, so file ids (and the order of the samples) do not depend on the file system
+    for file_path in sorted(json_files):
+        file_name = os.path.basename(file_path)
+        scenario = determine_scenario(file_name)
+        file_type = next((t for t in extractors if t in file_name), None)
+        if file_type is None:
+            continue
         
         try:
-            if "cell_info" in file_path:
-                categorized_data[scenario]["cell_info"].extend(extract_cell_info(file_path))
-            elif "iperf3" in file_path:
-                categorized_data[scenario]["iperf3"].extend(extract_iperf3(file_path))
-            elif "ping" in file_path:
-                categorized_data[scenario]["ping"].extend(extract_ping(file_path))
+            with instr.span("extract"):
+                files_table, samples_table = extractors[file_type](file_path)
+            instr.count("files")
+            instr.count("input_bytes", os.path.getsize(file_path))
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
             continue
+
+        if file_type not in categorized_data[scenario]:
+            categorized_data[scenario][file_type] = (Table(f"{file_type}_files"), Table(file_type))
+        scenario_files, scenario_samples = categorized_data[scenario][file_type]
+        file_id = len(scenario_files)
+        scenario_files.extend(files_table, file_id)
+        scenario_samples.extend(samples_table, file_id)
     
     for scenario, file_types in categorized_data.items():
         folder_name = os.path.join(extracted_data_folder, scenario)
         os.makedirs(folder_name, exist_ok=True)
         
-        for file_type, data in file_types.items():
-            output_file = os.path.join(folder_name, f"{file_type}.csv")
-            write_to_csv(data, output_file)
+        for tables in file_types.values():
+            for table in tables:
+                output_file = os.path.join(folder_name, f"{table.name}.csv")
+                with instr.span("write"):
+                    table.write_csv(output_file)
+                instr.count("rows", len(table))
+                instr.count("output_bytes", os.path.getsize(output_file))
+
+    instr.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,509 @@
+"""
+Time-range index of the campaign logs (logs_*), for queries over a time window.
+
+The index is a SQLite database with:
+
+- files: one row per JSON log file (campaign, file name, log type, scenario,
+  device, start and end time). The start time is the timestamp of the file
+  name (e.g., cell_info-udp-20250221-133001.json), in the local time of the
+  campaign, and the end time adds the duration of the run.
+- row_ranges: rows of each file in the extracted sample tables of get_data.py
+  ([campaign]_extracted_data/[scenario]/[type].csv), as row and byte ranges, so
+  the samples of a time window are read without reading the whole table.
+
+Entries are refreshed when a log file or an extracted table changes (size or
+modification time), so only new or modified files are parsed.
+
+Examples:
+
+    python3 log_index.py --scenario udp-uplink --start 2025-03-06T12:00 --end 2025-03-06T20:00
+    python3 log_index.py --type iperf3 --hours 8-20
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import re
+import sqlite3
+
+from get_data import determine_scenario, read_table
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs-index.sqlite")
+
+# Log types, as in the file names (e.g., iperf3-udp-20250221-133001.json)
+LOG_TYPES = ["cell_info", "iperf3", "ping"]
+
+FILE_TIMESTAMP_PATTERN = re.compile(r"-(\d{8}-\d{6})\.json$")
+FILE_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+# Times are stored as text, so they sort chronologically and work with the SQLite date functions
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    campaign TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    log_type TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    device TEXT,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (campaign, file_name)
+);
+CREATE INDEX IF NOT EXISTS files_by_time ON files (scenario, start_time, end_time);
+CREATE TABLE IF NOT EXISTS tables (
+    campaign TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (campaign, scenario, table_name)
+);
+CREATE TABLE IF NOT EXISTS row_ranges (
+    campaign TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    row_offset INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    byte_length INTEGER NOT NULL,
+    PRIMARY KEY (campaign, scenario, table_name, file_id)
+);
+"""
+
+
+#######################################
+# LOG FILES
+#######################################
+def parse_time(text: str) -> str:
+    """
+    Parse a time given as 2025-03-06, 2025-03-06T12:00[:00], 2025-03-06 12:00 or 20250306-120000.
+
+    Args
+    ----
+        text: Time, in the local time of the campaigns.
+
+    Returns
+    -------
+        Time in TIME_FORMAT.
+
+    Raises
+    ------
+        ValueError: If the time cannot be parsed.
+    """
+
+    try:
+        time = datetime.datetime.strptime(text, FILE_TIMESTAMP_FORMAT)
+    except ValueError:
+        time = datetime.datetime.fromisoformat(text)
+
+    return time.strftime(TIME_FORMAT)
+
+
+def parse_hours(text: str) -> tuple:
+    """
+    Parse a range of hours of the day (e.g., 8-20 for daytime, 20-8 for night-time).
+
+    Args
+    ----
+        text: First and last hour (exclusive), separated by "-".
+
+    Returns
+    -------
+        First and last hour.
+
+    Raises
+    ------
+        ValueError: If the range cannot be parsed.
+    """
+
+    first, last = (int(hour) for hour in text.split("-"))
+    if not (0 <= first <= 24 and 0 <= last <= 24):
+        raise ValueError(f"Invalid hours: {text}")
+
+    return first, last
+
+
+def log_type(file_name: str) -> str:
+    return next((t for t in LOG_TYPES if t in file_name), None)
+
+
+def read_log_entry(file_path: str) -> dict:
+    """
+    Read the time range and device of a JSON log file.
+
+    Args
+    ----
+        file_path: JSON log file (cell_info, iperf3 or ping).
+
+    Returns
+    -------
+        Entry of the files table (device is only known for cell_info files), or None if the
+        name of the file has no timestamp.
+    """
+
+    file_name = os.path.basename(file_path)
+    match = FILE_TIMESTAMP_PATTERN.search(file_name)
+    file_type = log_type(file_name)
+    if not match or file_type is None:
+        return None
+
+    with open(file_path, "r") as file:
+        # Some files of interrupted runs contain null
+        data = json.load(file) or {}
+
+    device = None
+    if file_type == "cell_info":
+        device = data.get("general_info", {}).get("device_serial")
+        # Samples are taken every second; run-length encoded samples cover "count" seconds
+        duration = max(
+            (sample.get("iteration", 0) + sample.get("count", 1) - 1 for sample in data.get("samples", [])),
+            default=0,
+        )
+    elif file_type == "iperf3":
+        intervals = data.get("intervals", [])
+        duration = data.get("start", {}).get("test_start", {}).get("duration") or (
+            intervals[-1].get("sum", {}).get("end", 0) if intervals else 0
+        )
+    else:
+        duration = data["time_ms"] / 1000 if data.get("time_ms") else len(data.get("responses", []))
+
+    start_time = datetime.datetime.strptime(match.group(1), FILE_TIMESTAMP_FORMAT)
+    stat = os.stat(file_path)
+
+    return {
+        "file_name": file_name,
+        "log_type": file_type,
+        "scenario": determine_scenario(file_name),
+        "device": device,
+        "start_time": start_time.strftime(TIME_FORMAT),
+        "end_time": (start_time + datetime.timedelta(seconds=duration)).strftime(TIME_FORMAT),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def scan_row_ranges(table_file: str) -> list:
+    """
+    Find the rows of each file in an extracted sample table (rows of the same file are
+    consecutive, see get_data.py).
+
+    Args
+    ----
+        table_file: Sample table (e.g., logs_22_02_extracted_data/udp-uplink/iperf3.csv).
+
+    Returns
+    -------
+        List of (file_id, row_offset, n_rows, byte_offset, byte_length), by file_id.
+    """
+
+    ranges = []
+    with open(table_file, "rb") as file:
+        byte_offset = len(file.readline())
+        row = 0
+        for line in file:
+            file_id = int(line[: line.index(b",")])
+            if ranges and ranges[-1][0] == file_id:
+                ranges[-1][2] += 1
+                ranges[-1][4] += len(line)
+            else:
+                ranges.append([file_id, row, 1, byte_offset, len(line)])
+            row += 1
+            byte_offset += len(line)
+
+    return [tuple(entry) for entry in ranges]
+
+
+#######################################
+# INDEX
+#######################################
+class LogIndex:
+    """
+    SQLite index of the time ranges of the campaign logs.
+    """
+
+    def __init__(self, index_file: str = INDEX_FILE) -> None:
+        """
+        Args
+        ----
+            index_file: SQLite database (created if it does not exist).
+        """
+
+        self.connection = sqlite3.connect(index_file)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def update_campaign(self, logs_dir: str) -> int:
+        """
+        Index the new and modified log files of a campaign, and forget its deleted files.
+
+        Args
+        ----
+            logs_dir: Campaign directory (e.g., logs_22_02).
+
+        Returns
+        -------
+            Number of (re)indexed files.
+        """
+
+        campaign = os.path.basename(os.path.normpath(logs_dir))
+        indexed = {
+            row["file_name"]: (row["size"], row["mtime_ns"])
+            for row in self.connection.execute("SELECT file_name, size, mtime_ns FROM files WHERE campaign = ?", (campaign,))
+        }
+
+        json_files = {os.path.basename(path): path for path in glob.glob(os.path.join(logs_dir, "*.json"))}
+        entries = []
+        for file_name, file_path in sorted(json_files.items()):
+            stat = os.stat(file_path)
+            if indexed.get(file_name) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                entry = read_log_entry(file_path)
+            except (OSError, ValueError) as e:
+                print(f"Error indexing {file_path}: {e}")
+                continue
+            if entry is not None:
+                entries.append(entry)
+
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM files WHERE campaign = ? AND file_name = ?",
+                [(campaign, file_name) for file_name in indexed if file_name not in json_files],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES "
+                "(:campaign, :file_name, :log_type, :scenario, :device, :start_time, :end_time, :size, :mtime_ns)",
+                [dict(entry, campaign=campaign) for entry in entries],
+            )
+            # The iperf3 and ping files of a run were logged by the device of its cell_info file
+            self.connection.execute(
+                """
+                UPDATE files SET device = (
+                    SELECT cell_info.device FROM files AS cell_info
+                    WHERE cell_info.campaign = files.campaign
+                    AND cell_info.log_type = 'cell_info'
+                    AND substr(cell_info.file_name, length('cell_info-') + 1) = substr(files.file_name, instr(files.file_name, '-') + 1)
+                )
+                WHERE campaign = ? AND log_type != 'cell_info'
+                """,
+                (campaign,),
+            )
+
+        return len(entries)
+
+    def update(self, logs_root: str) -> int:
+        """
+        Index the new and modified log files of every campaign (logs_*) of a directory.
+
+        Args
+        ----
+            logs_root: Directory of the campaigns.
+
+        Returns
+        -------
+            Number of (re)indexed files.
+        """
+
+        n_files = 0
+        for logs_dir in sorted(glob.glob(os.path.join(logs_root, "logs_*"))):
+            if os.path.isdir(logs_dir) and not logs_dir.endswith("_extracted_data"):
+                n_files += self.update_campaign(logs_dir)
+
+        return n_files
+
+    def query(
+        self,
+        campaigns: list = None,
+        scenarios: list = None,
+        log_types: list = None,
+        devices: list = None,
+        start: str = None,
+        end: str = None,
+        hours: tuple = None,
+    ) -> list:
+        """
+        Find the log files whose run overlaps a time window.
+
+        Args
+        ----
+            campaigns: Campaigns (e.g., ["logs_06_03"]; by default, all of them).
+            scenarios: Scenarios (e.g., ["udp-uplink"]; by default, all of them).
+            log_types: Log types (cell_info, iperf3 or ping; by default, all of them).
+            devices: Device serial numbers (by default, all of them).
+            start: Start of the window (TIME_FORMAT; by default, unbounded).
+            end: End of the window (TIME_FORMAT, exclusive; by default, unbounded).
+            hours: First and last hour of the day (exclusive) of the start of the runs
+                (e.g., (20, 8) for night-time runs).
+
+        Returns
+        -------
+            Matching files (campaign, file_name, log_type, scenario, device, start_time, end_time),
+            in time order.
+        """
+
+        conditions, parameters = [], []
+        for column, values in (
+            ("campaign", campaigns),
+            ("scenario", scenarios),
+            ("log_type", log_types),
+            ("device", devices),
+        ):
+            if values:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                parameters += list(values)
+
+        if start:
+            conditions.append("end_time > ?")
+            parameters.append(start)
+        if end:
+            conditions.append("start_time < ?")
+            parameters.append(end)
+        if hours:
+            first, last = hours
+            hour = "CAST(strftime('%H', start_time) AS INTEGER)"
+            # Ranges such as 20-8 wrap around midnight
+            conditions.append(f"({hour} >= ? {'AND' if first <= last else 'OR'} {hour} < ?)")
+            parameters += [first, last]
+
+        rows = self.connection.execute(
+            "SELECT campaign, file_name, log_type, scenario, device, start_time, end_time FROM files"
+            + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+            + " ORDER BY start_time, campaign, file_name",
+            parameters,
+        )
+
+        return [dict(row) for row in rows]
+
+    def row_ranges(self, logs_dir: str, scenario: str, table_name: str, file_names: list) -> list:
+        """
+        Get the rows of some files in an extracted sample table, rescanning the table if it changed.
+
+        Args
+        ----
+            logs_dir: Campaign directory processed by get_data.py (e.g., logs_22_02).
+            scenario: Scenario (e.g., udp-uplink).
+            table_name: Sample table (cell_info, iperf3 or ping).
+            file_names: Log files (e.g., from query()).
+
+        Returns
+        -------
+            List of (file_id, row_offset, n_rows, byte_offset, byte_length), by file_id (files
+            without samples in the table are left out).
+        """
+
+        campaign = os.path.basename(os.path.normpath(logs_dir))
+        scenario_dir = os.path.join(os.path.normpath(logs_dir) + "_extracted_data", scenario)
+        table_file = os.path.join(scenario_dir, f"{table_name}.csv")
+        if not os.path.exists(table_file):
+            return []
+
+        key = (campaign, scenario, table_name)
+        stat = os.stat(table_file)
+        indexed = self.connection.execute(
+            "SELECT size, mtime_ns FROM tables WHERE campaign = ? AND scenario = ? AND table_name = ?", key
+        ).fetchone()
+
+        if indexed is None or tuple(indexed) != (stat.st_size, stat.st_mtime_ns):
+            files = read_table(scenario_dir, f"{table_name}_files", ["file_id", "file_name"])
+            file_ids = dict(zip(files["file_id"], files["file_name"]))
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM row_ranges WHERE campaign = ? AND scenario = ? AND table_name = ?", key
+                )
+                self.connection.executemany(
+                    "INSERT INTO row_ranges VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(*key, file_id, file_ids[file_id], *ranges) for file_id, *ranges in scan_row_ranges(table_file)],
+                )
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?)", (*key, stat.st_size, stat.st_mtime_ns)
+                )
+
+        rows = self.connection.execute(
+            "SELECT file_id, file_name, row_offset, n_rows, byte_offset, byte_length FROM row_ranges "
+            "WHERE campaign = ? AND scenario = ? AND table_name = ? ORDER BY file_id",
+            key,
+        )
+        selected = set(file_names)
+
+        return [
+            (row["file_id"], row["row_offset"], row["n_rows"], row["byte_offset"], row["byte_length"])
+            for row in rows
+            if row["file_name"] in selected
+        ]
+
+
+def read_window(index: LogIndex, logs_dir: str, scenario: str, table_name: str, columns: list = None, **window):
+    """
+    Load the samples of the runs of a time window from an extracted table, reading only their rows.
+
+    Args
+    ----
+        index: Log index (updated with the campaign).
+        logs_dir: Campaign directory processed by get_data.py (e.g., logs_22_02).
+        scenario: Scenario (e.g., udp-uplink).
+        table_name: Sample table (cell_info, iperf3 or ping).
+        columns: Columns to load (by default, all of them).
+        window: Filters of LogIndex.query() (devices, start, end, hours).
+
+    Returns
+    -------
+        DataFrame with the samples (see read_table in get_data.py).
+    """
+
+    campaign = os.path.basename(os.path.normpath(logs_dir))
+    files = index.query(campaigns=[campaign], scenarios=[scenario], log_types=[table_name], **window)
+    ranges = index.row_ranges(logs_dir, scenario, table_name, [entry["file_name"] for entry in files])
+    scenario_dir = os.path.join(os.path.normpath(logs_dir) + "_extracted_data", scenario)
+
+    return read_table(scenario_dir, table_name, columns, byte_ranges=[(offset, length) for *_, offset, length in ranges])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Update the time-range index of the campaign logs and list the log files of a time window."
+    )
+
+    parser.add_argument(
+        "--logs_root",
+        type=str,
+        default=os.path.dirname(os.path.abspath(__file__)),
+        help="Directory of the campaigns (logs_*) (default: the script location)",
+    )
+
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=INDEX_FILE,
+        help="SQLite index file (default: logs-index.sqlite, next to the script)",
+    )
+
+    parser.add_argument("--campaign", type=str, action="append", help="Campaign (e.g., logs_06_03; can be repeated)")
+    parser.add_argument("--scenario", type=str, action="append", help="Scenario (e.g., udp-uplink; can be repeated)")
+    parser.add_argument("--type", type=str, action="append", choices=LOG_TYPES, help="Log type (can be repeated)")
+    parser.add_argument("--device", type=str, action="append", help="Device serial number (can be repeated)")
+    parser.add_argument("--start", type=parse_time, help="Start of the window (e.g., 2025-03-06T12:00), in local time")
+    parser.add_argument("--end", type=parse_time, help="End of the window (exclusive), in local time")
+    parser.add_argument("--hours", type=parse_hours, help="Hours of the day of the runs (e.g., 8-20, or 20-8)")
+
+    args = parser.parse_args()
+
+    index = LogIndex(args.index)
+    print(f"Indexed {index.update(args.logs_root)} new or modified log files.")
+
+    for entry in index.query(args.campaign, args.scenario, args.type, args.device, args.start, args.end, args.hours):
+        print(
+            f"{entry['campaign']}/{entry['file_name']}\t{entry['scenario']}\t{entry['device'] or '-'}\t"
+            f"{entry['start_time']} - {entry['end_time']}"
+        )
+
+    index.close()